@@ -3,6 +3,32 @@
 # Add imports here
 from .functions import *
 from .spinconfig import SpinConfig
+from .bitspin import BitSpinConfig
+from .encoding import decimals_to_spins, spins_to_decimals
+from .ensemble import SpinEnsemble
+from .sweep import parameter_sweep
+from .tempering import ParallelTempering
+from .cluster import wolff_update, swendsen_wang_update
+from .exact import (
+    density_of_states,
+    density_of_states_observables,
+    enumeration_observables,
+    transfer_matrix_observables,
+)
+from .reweighting import energy_histogram, multi_histogram_reweighting, single_histogram_reweighting
+from .rng import RandomBuffer, make_rng, spawn_rngs
+from .statistics import RunningStats
+from .wanglandau import WangLandau
+from .trajectory import TrajectoryReader, TrajectoryWriter
+from .analysis import (
+    autocorrelation_function,
+    binning_errors,
+    effective_sample_size,
+    geweke_z_score,
+    integrated_autocorrelation_time,
+    mser_burn_in,
+    time_series_analysis,
+)
 
 
 # Handle versioneer
@@ -0,0 +1,24 @@
+"""
+Atomic file replacement shared by the caches, checkpoints and trajectory indices
+"""
+
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def _atomic_open(path, mode="wb"):
+    """Open a temporary file next to path that replaces path when the block finishes without error.
+
+    os.replace is atomic, so concurrent readers and a writer that is preempted mid-way never leave or see
+    a partial file; the temporary file is removed if the block raises.
+    """
+    tmp_path = f"{os.fspath(path)}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode) as handle:
+            yield handle
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,326 @@
+"""
+Error analysis of correlated Monte Carlo time series: autocorrelation time, effective sample size and binning
+
+Every function reads the series in slices of chunk_size samples, so a numpy.memmap of 10**8 samples is
+analysed in bounded memory; ordinary arrays and lists work as well.
+"""
+
+import numpy as np
+
+from .statistics import RunningStats
+
+
+def _series_stats(x, chunk_size):
+    """RunningStats of all samples of x, reduced chunk by chunk."""
+    stats = RunningStats()
+    for start in range(0, len(x), chunk_size):
+        stats.add_batch(np.asarray(x[start:start + chunk_size], dtype=float))
+    return stats
+
+
+def autocorrelation_function(x, max_lag=None, chunk_size=2**20):
+    """Normalized autocorrelation rho(k) of a time series for the lags k = 0, ..., max_lag.
+
+    The autocovariance is summed chunk by chunk; every chunk is correlated with itself extended by
+    max_lag samples of the next chunk through a zero-padded FFT, so no lag pair is lost at the chunk
+    borders and memory stays proportional to chunk_size + max_lag.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Time series, e.g. the energy of every Metropolis step.
+    max_lag : int, optional
+        Largest lag, default None uses min(len(x) - 1, chunk_size).
+    chunk_size : int, optional
+        Number of samples processed at once, default chunk_size = 2**20
+
+    Returns
+    -------
+    rho : numpy.ndarray
+        Autocorrelation of the lags 0, ..., max_lag, rho[0] = 1.
+
+    Examples
+    --------
+    >>> autocorrelation_function([1.0, -1.0, 1.0, -1.0], max_lag=2)
+    array([ 1.  , -0.75,  0.5 ])
+    """
+    n = len(x)
+    if max_lag is None:
+        max_lag = min(n - 1, chunk_size)
+    max_lag = min(max_lag, n - 1)
+
+    mean = _series_stats(x, chunk_size).mean
+    autocovariance = np.zeros(max_lag + 1)
+    for start in range(0, n, chunk_size):
+        chunk = np.asarray(x[start:start + chunk_size], dtype=float) - mean
+        extended = np.asarray(x[start:start + chunk_size + max_lag], dtype=float) - mean
+
+        # padding to len(chunk) + max_lag keeps the circular correlation free of wrap-around at lags <= max_lag
+        fft_length = 1 << int(len(chunk) + max_lag - 1).bit_length()
+        spectrum = np.conj(np.fft.rfft(chunk, fft_length)) * np.fft.rfft(extended, fft_length)
+        autocovariance += np.fft.irfft(spectrum, fft_length)[: max_lag + 1]
+
+    if autocovariance[0] == 0:
+        # a constant series has no correlations
+        rho = np.zeros(max_lag + 1)
+        rho[0] = 1.0
+        return rho
+
+    return autocovariance / autocovariance[0]
+
+
+def integrated_autocorrelation_time(x, c=5.0, max_lag=None, chunk_size=2**20):
+    """Integrated autocorrelation time tau = 1 + 2 * sum_k rho(k) with Sokal's automatic window.
+
+    The sum is truncated at the smallest window W with W >= c * tau(W), which balances the bias of a
+    short window against the noise of a long one. If no such window is found up to max_lag, the estimate
+    at max_lag is returned and underestimates tau.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Time series, e.g. the energy of every Metropolis step.
+    c : float, optional
+        Window constant, default c = 5.0
+    max_lag : int, optional
+        Largest lag, default None uses min(len(x) - 1, chunk_size).
+    chunk_size : int, optional
+        Number of samples processed at once, default chunk_size = 2**20
+
+    Returns
+    -------
+    tau : float
+        Integrated autocorrelation time in units of samples, 1 for uncorrelated samples.
+    """
+    rho = autocorrelation_function(x, max_lag, chunk_size)
+    taus = 2.0 * np.cumsum(rho) - 1.0
+
+    outside = np.arange(len(taus)) >= c * taus
+    window = np.argmax(outside) if outside.any() else len(taus) - 1
+
+    return float(taus[window])
+
+
+def effective_sample_size(x, c=5.0, max_lag=None, chunk_size=2**20):
+    """Number of independent samples len(x) / tau that a correlated series is worth.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Time series, e.g. the energy of every Metropolis step.
+    c : float, optional
+        Window constant of integrated_autocorrelation_time, default c = 5.0
+    max_lag : int, optional
+        Largest lag, default None uses min(len(x) - 1, chunk_size).
+    chunk_size : int, optional
+        Number of samples processed at once, default chunk_size = 2**20
+
+    Returns
+    -------
+    ess : float
+        Effective sample size.
+    """
+    return len(x) / integrated_autocorrelation_time(x, c, max_lag, chunk_size)
+
+
+def binning_errors(x, min_blocks=32, chunk_size=2**20):
+    """Standard error of the mean of a correlated series from blocks of 1, 2, 4, ... samples.
+
+    Block means become independent once the block size exceeds the autocorrelation time, so the error
+    grows with the block size until it reaches a plateau, the true standard error. Every level keeps a
+    RunningStats of its block means; chunk_size is rounded up to a multiple of the largest block, so the
+    blocks of every level stay aligned across chunks.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Time series, e.g. the energy of every Metropolis step.
+    min_blocks : int, optional
+        Smallest number of blocks of the largest block size, default min_blocks = 32
+    chunk_size : int, optional
+        Number of samples processed at once, default chunk_size = 2**20
+
+    Returns
+    -------
+    block_sizes, errors : set of numpy.ndarray
+        Block sizes 2**l and the standard error of the mean estimated with each of them.
+
+    Examples
+    --------
+    >>> block_sizes, errors = binning_errors(np.repeat([1.0, -1.0], 64))
+    >>> block_sizes
+    array([1, 2, 4])
+    """
+    n = len(x)
+    if n < 2 * min_blocks:
+        raise ValueError(f"len(x)({n}) should be at least 2 * min_blocks({2 * min_blocks}). ")
+
+    levels = int(n // min_blocks).bit_length()
+    block_sizes = 2 ** np.arange(levels)
+    largest = int(block_sizes[-1])
+    chunk_size = -(-chunk_size // largest) * largest
+
+    level_stats = [RunningStats() for level in range(levels)]
+    for start in range(0, n, chunk_size):
+        chunk = np.asarray(x[start:start + chunk_size], dtype=float)
+        for block_size, stats in zip(block_sizes, level_stats):
+            # a trailing incomplete block of the last chunk is dropped
+            n_blocks = len(chunk) // block_size
+            if n_blocks > 0:
+                stats.add_batch(chunk[: n_blocks * block_size].reshape(n_blocks, block_size).mean(axis=1))
+
+    errors = np.array([np.sqrt(stats.variance / (stats.count - 1)) for stats in level_stats])
+
+    return block_sizes, errors
+
+
+def _batch_means(x, batch_size, n_batches, center, chunk_size):
+    """Means of the first n_batches batches of x minus center, yielded chunk by chunk."""
+    step = max(chunk_size // batch_size, 1) * batch_size
+    stop = n_batches * batch_size
+    for start in range(0, stop, step):
+        chunk = np.asarray(x[start:min(start + step, stop)], dtype=float)
+        yield chunk.reshape(-1, batch_size).mean(axis=1) - center
+
+
+def mser_burn_in(x, batch_size=5, chunk_size=2**20):
+    """Number of initial samples to discard, by the marginal standard error rule (MSER).
+
+    The truncation point d minimizes the squared standard error sum_{i>=d} (y_i - <y>_d)**2 / (n - d)**2
+    of the batch means y that remain, i.e. it drops the transient as long as that shrinks the error more
+    than the loss of samples grows it. Only truncations within the first half of the series are
+    considered; a result close to len(x) / 2 means the series has not equilibrated yet. The sums over
+    the remaining batches are the totals minus running prefix sums, so the batch means are never held
+    in memory at once.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Time series, e.g. the energy of every Metropolis step.
+    batch_size : int, optional
+        Number of samples per batch mean, default batch_size = 5 (MSER-5)
+    chunk_size : int, optional
+        Number of samples processed at once, default chunk_size = 2**20
+
+    Returns
+    -------
+    burn_in : int
+        Number of samples to discard, a multiple of batch_size.
+
+    Examples
+    --------
+    >>> mser_burn_in(np.concatenate([np.linspace(10.0, 0.0, 50), np.tile([1.0, -1.0], 500)]))
+    50
+    """
+    n_batches = len(x) // batch_size
+    if n_batches == 0:
+        return 0
+
+    # centering on the overall mean keeps the differences of the sums below accurate
+    center = _series_stats(x[: n_batches * batch_size], chunk_size).mean
+    total_sum = total_square_sum = 0.0
+    for y in _batch_means(x, batch_size, n_batches, center, chunk_size):
+        total_sum += y.sum()
+        total_square_sum += (y**2).sum()
+
+    def mser_chunks():
+        """MSER of the truncations d = 0, ..., n_batches // 2, chunk by chunk."""
+        prefix_sum = prefix_square_sum = 0.0
+        d = 0
+        for y in _batch_means(x, batch_size, n_batches // 2 + 1, center, chunk_size):
+            cumulative_sum = prefix_sum + np.cumsum(y)
+            cumulative_square_sum = prefix_square_sum + np.cumsum(y**2)
+            # sums over the batches that remain after discarding the first d
+            remaining = n_batches - np.arange(d, d + len(y))
+            suffix_sum = total_sum - (cumulative_sum - y)
+            suffix_square_sum = total_square_sum - (cumulative_square_sum - y**2)
+            yield (suffix_square_sum - suffix_sum**2 / remaining) / remaining**2
+
+            prefix_sum, prefix_square_sum = cumulative_sum[-1], cumulative_square_sum[-1]
+            d += len(y)
+
+    mser_min, mser_max = np.inf, -np.inf
+    for mser in mser_chunks():
+        mser_min, mser_max = min(mser_min, mser.min()), max(mser_max, mser.max())
+
+    # a tail frozen in one state reaches the minimum 0 only up to rounding, take the first such truncation
+    d = 0
+    for mser in mser_chunks():
+        candidates = np.flatnonzero(mser <= mser_min + 1e-10 * mser_max)
+        if len(candidates) > 0:
+            return int(d + candidates[0]) * batch_size
+        d += len(mser)
+
+
+def geweke_z_score(x, first=0.1, last=0.5, chunk_size=2**20):
+    """Geweke's test of equilibration, comparing the means of the start and the end of a series.
+
+    Each mean gets the standard error sqrt(var * tau / n) of its correlated segment, so |z| well above 2
+    indicates that the first segment is still in the transient.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Time series, e.g. the energy of every Metropolis step.
+    first : float, optional
+        Fraction of the series in the first segment, default first = 0.1
+    last : float, optional
+        Fraction of the series in the last segment, default last = 0.5
+    chunk_size : int, optional
+        Number of samples processed at once, default chunk_size = 2**20
+
+    Returns
+    -------
+    z : float
+        Difference of the segment means in units of its standard error.
+    """
+    n = len(x)
+    means = []
+    variances = []
+    for segment in (x[: int(first * n)], x[n - int(last * n):]):
+        stats = _series_stats(segment, chunk_size)
+        tau = integrated_autocorrelation_time(segment, chunk_size=chunk_size)
+        means.append(stats.mean)
+        variances.append(stats.variance * tau / len(segment))
+
+    if variances[0] + variances[1] == 0:
+        return 0.0 if means[0] == means[1] else float(np.inf)
+
+    return float((means[0] - means[1]) / np.sqrt(variances[0] + variances[1]))
+
+
+def time_series_analysis(x, c=5.0, min_blocks=32, max_lag=None, chunk_size=2**20):
+    """Mean with error bars of a correlated series from the sampler.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Time series, e.g. the energy of every Metropolis step.
+    c : float, optional
+        Window constant of integrated_autocorrelation_time, default c = 5.0
+    min_blocks : int, optional
+        Smallest number of blocks of binning_errors, default min_blocks = 32
+    max_lag : int, optional
+        Largest lag, default None uses min(len(x) - 1, chunk_size).
+    chunk_size : int, optional
+        Number of samples processed at once, default chunk_size = 2**20
+
+    Returns
+    -------
+    mean, error, tau, ess : set
+        Mean, binning standard error of the largest block size, integrated autocorrelation time and
+        effective sample size.
+
+    Examples
+    --------
+    >>> import itertools
+    >>> myspin = SpinConfig(8)
+    >>> E, m = np.array(list(itertools.islice(myspin.metropolis_stream(T=1), 100000))).T
+    >>> time_series_analysis(E)
+    (-15.835204, 0.029286670389583287, 83.65581646647101, 1195.3741440092176)
+    """
+    mean = float(_series_stats(x, chunk_size).mean)
+    block_sizes, errors = binning_errors(x, min_blocks, chunk_size)
+    tau = integrated_autocorrelation_time(x, c, max_lag, chunk_size)
+
+    return mean, float(errors[-1]), tau, len(x) / tau
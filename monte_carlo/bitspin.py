@@ -0,0 +1,267 @@
+"""
+BitSpinConfig class, a SpinConfig whose spin configuration is packed into the bits of a bytearray
+"""
+
+from .exact import _macrostate_energy
+from .spinconfig import SpinConfig
+
+import numpy as np
+
+
+class _SpinlistView(list):
+    """Spinlist of a BitSpinConfig whose item assignments are written back to its bits.
+
+    The length of a spin chain is fixed, so operations that add or remove spins raise TypeError.
+    """
+
+    def __init__(self, owner):
+        super().__init__(owner._unpacked().tolist())
+        self._owner = owner
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            spins = list(self)
+            spins[index] = value
+            self._owner._encode(spins)
+        else:
+            self._owner._set_spin(range(len(self))[index], value)
+        super().__setitem__(index, value)
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._owner._encode(self)
+
+    def reverse(self):
+        super().reverse()
+        self._owner._encode(self)
+
+    def _fixed_length(self, *args, **kwargs):
+        raise TypeError("the spinlist of a BitSpinConfig has the fixed length N_length. ")
+
+    __delitem__ = __iadd__ = __imul__ = _fixed_length
+    append = extend = insert = pop = remove = clear = _fixed_length
+
+
+class BitSpinConfig(SpinConfig):
+    def __init__(self, N_length=10, rng=None, buffer_size=65536):
+        """Create a 1-d Ising model whose spins are stored as the bits of a mutable bytearray.
+
+        Site i is bit 7 - i % 8 of byte i // 8 of self.bits, the np.packbits layout, so a flip is an
+        in-place XOR of one byte and costs the same at every N_length. self.state is the decimal number
+        init_input_decimal takes, the magnetization and the number of domain walls are counted with
+        numpy over the unpacked bits. spinlist is a list view decoded from self.bits and cached until the
+        next change; assigning a list to it or to one of its items re-encodes the bits.
+
+        Parameters
+        ----------
+        N_length: integer , optional
+            Length of the list.
+        rng: int, numpy.random.SeedSequence or numpy.random.Generator, optional
+            Seed or generator of the random numbers, see make_rng, default None draws fresh entropy.
+        buffer_size: int, optional
+            Number of pre-generated Metropolis proposals per block, default buffer_size = 65536
+
+        Returns
+        -------
+        BitSpinConfig : class
+            A class of bit-packed spin configuration with length N_length, starting with all spins down.
+
+        Examples
+        --------
+        >>> myspin = BitSpinConfig(8)
+        >>> myspin.init_input_decimal(10)
+        [0, 0, 0, 0, 1, 0, 1, 0]
+        >>> myspin.state
+        10
+        """
+        super().__init__(N_length, rng, buffer_size)
+
+    @property
+    def spinlist(self):
+        """Binary list view of self.bits, '0' represents: spin down. '1' represents: spin up."""
+        if self._spinlist is None:
+            self._spinlist = _SpinlistView(self)
+        return self._spinlist
+
+    @spinlist.setter
+    def spinlist(self, binary_list):
+        if len(binary_list) == 0:
+            self.bits = bytearray((self.N_length + 7) // 8)
+        else:
+            self._encode(binary_list)
+        self._spinlist = None
+
+    def _encode(self, binary_list):
+        """Pack a binary list of N_length spins into self.bits."""
+        if len(binary_list) != self.N_length:
+            raise ValueError(f"spinlist length({len(binary_list)}) does not match N_length={self.N_length}. ")
+        self.bits = bytearray(np.packbits(np.asarray(binary_list, dtype=np.uint8)).tobytes())
+
+    def _set_spin(self, site, spin):
+        """Set the spin on site to 0 or 1 in place."""
+        if spin not in (0, 1):
+            raise ValueError(f"spin({spin}) should be 0 or 1. ")
+        spin = int(spin)
+        self.bits[site >> 3] = (self.bits[site >> 3] & ~(0x80 >> (site & 7))) | (spin << (7 - (site & 7)))
+
+    @property
+    def state(self):
+        """Decimal value of the spin configuration, site 0 is the highest bit."""
+        padding = 8 * len(self.bits) - self.N_length
+        return int.from_bytes(self.bits, "big") >> padding
+
+    @state.setter
+    def state(self, decimal_input):
+        padding = 8 * len(self.bits) - self.N_length
+        self.bits = bytearray((int(decimal_input) << padding).to_bytes(len(self.bits), "big"))
+        self._spinlist = None
+
+    def _unpacked(self):
+        """Spins as a uint8 array of 0 and 1."""
+        return np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8), count=self.N_length)
+
+    # spinlist initialization
+    def init_input_decimal(self, decimal_input):
+        """Initialize spin configuration with a decimal input.
+
+        Parameters
+        ----------
+        decimal_Input : integar
+            The decimal value of a binary list.
+
+        Returns
+        -------
+        self.spinlist : list
+            A spin list represented by a binary list. '0' represents: spin down. '1' represents: spin up.
+
+        Examples
+        --------
+        >>> myspin = BitSpinConfig(8)
+        >>> myspin.init_input_decimal(10)
+        [0, 0, 0, 0, 1, 0, 1, 0]
+        """
+        if decimal_input < self.iMax:
+            self.state = int(decimal_input)
+        else:
+            raise ValueError(f"input decimal({decimal_input}) exceeds the biggest spinconfig 2**N={self.iMax}. ")
+
+        return self.spinlist
+
+    # spinlist manipulation:
+    def random_flip(self):
+        """Random flip spin on a random site for a given spinlist.
+
+        Returns
+        -------
+        self.spinlist : list
+            A binary spinlist with the spin on a random site flipped.
+        """
+        return self.flip(int(self.rng.integers(0, self.N_length)))
+
+    def flip(self, site):
+        """Flip the spin on a given site by XOR of its byte with its bit.
+
+        Parameters
+        ----------
+        site : integer
+            Index of the site to flip, in range [0, N_length).
+
+        Returns
+        -------
+        self.spinlist : list
+            The spinlist with the spin on site flipped.
+
+        Examples
+        --------
+        >>> myspin = BitSpinConfig(8)
+        >>> myspin.init_input_decimal(10)
+        [0, 0, 0, 0, 1, 0, 1, 0]
+        >>> myspin.flip(0)
+        [1, 0, 0, 0, 1, 0, 1, 0]
+        """
+        self._flip(site)
+
+        return self.spinlist
+
+    def _flip(self, site):
+        """Flip the spin on site in place, without building the spinlist view."""
+        self.bits[site >> 3] ^= 0x80 >> (site & 7)
+        self._spinlist = None
+
+    def _local_state(self, site):
+        """Return the spin on site and the number of its up nearest neighbors (periodic chain)."""
+        bits = self.bits
+        left = site - 1 if site > 0 else self.N_length - 1
+        right = site + 1 if site + 1 < self.N_length else 0
+        up_neighbors = ((bits[left >> 3] >> (7 - (left & 7))) & 1) + ((bits[right >> 3] >> (7 - (right & 7))) & 1)
+
+        return (bits[site >> 3] >> (7 - (site & 7))) & 1, up_neighbors
+
+    # spinlist properties:
+    def domain_walls(self):
+        """Count the bonds between anti-parallel nearest neighbors of the periodic chain.
+
+        Returns
+        -------
+        walls : integer
+            Number of sites whose spin differs from the spin of the previous site.
+
+        Examples
+        --------
+        >>> myspin = BitSpinConfig(8)
+        >>> myspin.init_input_decimal(10)
+        [0, 0, 0, 0, 1, 0, 1, 0]
+        >>> myspin.domain_walls()
+        4
+        """
+        spins = self._unpacked()
+        return int(np.count_nonzero(spins != np.roll(spins, 1)))
+
+    def magnetization(self):
+        """Calculate the magnetization of the spin configuration by counting the up bits.
+
+        Returns
+        -------
+        magnet: integer
+            magnetization of the spinlist
+
+        Examples
+        --------
+        >>> myspin = BitSpinConfig(8)
+        >>> myspin.init_input_decimal(10)
+        [0, 0, 0, 0, 1, 0, 1, 0]
+        >>> myspin.magnetization()
+        -4
+        """
+        self.magnet = 2 * int(np.count_nonzero(self._unpacked())) - self.N_length
+
+        return self.magnet
+
+    def hamiltonian(self, J=-2, u=1.1):
+        """Calculate the energy of the spin configuration from its magnetization and domain walls.
+
+        Parameters
+        ----------
+        J: float, optional
+            Coupling parameter, default J=-2 .
+        u: float, optional
+            External field strength, default u=1.1 .
+
+        Returns
+        -------
+        energy : float
+            Total energy from external field and the coupling between the nearest neighbors.
+
+        Examples
+        --------
+        >>> myspin = BitSpinConfig(8)
+        >>> myspin.init_input_decimal(10)
+        [0, 0, 0, 0, 1, 0, 1, 0]
+        >>> myspin.hamiltonian()
+        -4.4
+        """
+        self.u = u
+        self.J = J
+        self.energy = _macrostate_energy(self.N_length, self.magnetization(), self.domain_walls(), self.J, self.u)
+
+        return self.energy
@@ -0,0 +1,125 @@
+"""
+Cluster updates (Wolff and Swendsen-Wang) of a periodic 1-d Ising chain
+
+Both updates act in place on an int8 array of 0 (spin down) and 1 (spin up) and return the changes of
+energy and magnetization. A bond is 'satisfied' when it has its lowest energy, i.e. parallel spins for
+J > 0 and anti-parallel spins for J < 0; only satisfied bonds can join a cluster, so flipping a cluster
+keeps every bond inside it unchanged for either sign of J.
+"""
+
+import numpy as np
+
+from .rng import make_rng
+
+
+def wolff_update(spins, T=10, J=-2, u=1.1, rng=None):
+    """Grow one Wolff cluster from a random site and flip it.
+
+    On a chain the cluster is an arc grown to the right and to the left of the seed, adding every
+    satisfied bond with probability 1 - exp(-2|J|/T). The external field is not part of the growth rule,
+    so the flip is accepted with probability min(1, exp(-u * dM / T)).
+
+    Parameters
+    ----------
+    spins : numpy.ndarray
+        int8 array of 0 and 1, updated in place.
+    T : float, optional
+        Temperature
+    J: float, optional
+        Coupling parameter, default J=-2 .
+    u: float, optional
+        External field strength, default u=1.1 .
+    rng: numpy.random.Generator, optional
+        Generator of the random numbers, default None draws fresh entropy.
+
+    Returns
+    -------
+    dE, dm : set
+        Energy and magnetization change, both zero if the flip is rejected.
+    """
+    N_length = len(spins)
+    p_bond = 1.0 - np.exp(-2.0 * abs(J) / T)
+    bond_sign = 1 if J >= 0 else -1
+    rng = make_rng(rng)
+    seed = rng.integers(0, N_length)
+
+    def satisfied(i, j):
+        return (2 * spins[i % N_length] - 1) * (2 * spins[j % N_length] - 1) * bond_sign > 0
+
+    right = 0
+    while right + 1 < N_length and satisfied(seed + right, seed + right + 1) and rng.random() < p_bond:
+        right += 1
+    left = 0
+    while left + right + 1 < N_length and satisfied(seed - left, seed - left - 1) and rng.random() < p_bond:
+        left += 1
+
+    cluster = np.arange(seed - left, seed + right + 1) % N_length
+    dm = -2 * int((2 * spins[cluster].astype(np.int64) - 1).sum())
+
+    # field correction of the Wolff move
+    if u * dm > 0 and rng.random() >= np.exp(-u * dm / T):
+        return 0.0, 0
+
+    dE = u * dm
+    if len(cluster) < N_length:
+        # only the two bonds leaving the cluster change sign
+        first, last = cluster[0], cluster[-1]
+        dE += 2 * J * (2 * spins[first] - 1) * (2 * spins[first - 1] - 1)
+        dE += 2 * J * (2 * spins[last] - 1) * (2 * spins[(last + 1) % N_length] - 1)
+    spins[cluster] ^= 1
+
+    return float(dE), dm
+
+
+def swendsen_wang_update(spins, T=10, J=-2, u=1.1, rng=None):
+    """Decompose the whole chain into Swendsen-Wang clusters and flip each with probability 1/2.
+
+    The external field is represented by a ghost spin coupled to every site; a site whose field term is
+    satisfied bonds to the ghost with probability 1 - exp(-2|u|/T), and clusters bonded to the ghost stay.
+
+    Parameters
+    ----------
+    spins : numpy.ndarray
+        int8 array of 0 and 1, updated in place.
+    T : float, optional
+        Temperature
+    J: float, optional
+        Coupling parameter, default J=-2 .
+    u: float, optional
+        External field strength, default u=1.1 .
+    rng: numpy.random.Generator, optional
+        Generator of the random numbers, default None draws fresh entropy.
+
+    Returns
+    -------
+    dE, dm : set
+        Energy and magnetization change of the sweep.
+    """
+    N_length = len(spins)
+    rng = make_rng(rng)
+    sigma = 2 * spins.astype(np.int64) - 1
+    right = np.roll(sigma, -1)
+
+    # bond i joins site i and site i + 1, the ghost bond of site i is satisfied when u * sigma_i < 0
+    bonds = (J * sigma * right > 0) & (rng.random(N_length) < 1.0 - np.exp(-2.0 * abs(J) / T))
+    ghost_bonds = (u * sigma < 0) & (rng.random(N_length) < 1.0 - np.exp(-2.0 * abs(u) / T))
+
+    # a new cluster starts after every open bond, sites before the first start close the ring
+    starts = ~np.roll(bonds, 1)
+    if starts.any():
+        labels = np.cumsum(starts) - 1
+        labels[labels < 0] = labels.max()
+    else:
+        labels = np.zeros(N_length, dtype=np.int64)
+
+    n_clusters = labels.max() + 1
+    frozen = np.bincount(labels, weights=ghost_bonds, minlength=n_clusters) > 0
+    flip_cluster = (rng.random(n_clusters) < 0.5) & ~frozen
+    flipped = flip_cluster[labels]
+
+    new_sigma = np.where(flipped, -sigma, sigma)
+    dm = int(new_sigma.sum() - sigma.sum())
+    dE = u * dm - J * (new_sigma @ np.roll(new_sigma, -1) - sigma @ right)
+    spins[flipped] ^= 1
+
+    return float(dE), dm
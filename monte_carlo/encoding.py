@@ -0,0 +1,97 @@
+"""
+Bulk conversion between decimal configurations and (K, N_length) spin matrices
+
+Site 0 is the highest of the N_length bits, as in SpinConfig.init_input_decimal, and a spin matrix holds
+0 (spin down) or 1 (spin up) per site like the spins of SpinEnsemble. Both directions go through
+np.packbits / np.unpackbits of big-endian bytes, so no python code runs per spin.
+"""
+
+import numpy as np
+
+
+def decimals_to_spins(decimals, N_length=10, dtype=np.uint8):
+    """Spin configurations of many decimals at once.
+
+    Parameters
+    ----------
+    decimals : numpy.ndarray or list of int
+        K decimal values in [0, 2**N_length). Above N_length = 64 they are python integers, e.g. an
+        object array.
+    N_length: integer , optional
+        Length of the spin chain.
+    dtype : numpy.dtype, optional
+        Integer type of the spins, e.g. np.int8 for SpinEnsemble.spins, default dtype = np.uint8
+
+    Returns
+    -------
+    spins : numpy.ndarray
+        K x N_length matrix of 0 and 1, row k is the spinlist of decimals[k].
+
+    Examples
+    --------
+    >>> decimals_to_spins([10, 255], 8)
+    array([[0, 0, 0, 0, 1, 0, 1, 0],
+           [1, 1, 1, 1, 1, 1, 1, 1]], dtype=uint8)
+    """
+    decimals = np.asarray(decimals).ravel()
+    row_bytes = (N_length + 7) // 8
+
+    if decimals.size == 0:
+        return np.zeros((0, N_length), dtype=dtype)
+
+    if N_length <= 64 and decimals.dtype.kind in "iu":
+        if int(decimals.min()) < 0 or int(decimals.max()) >= 2**N_length:
+            raise ValueError(f"decimals should be between 0 and 2**N={2**N_length}. ")
+        # every value as 8 big-endian bytes, the leading 64 - N_length bits are zero
+        packed = decimals.astype(">u8").view(np.uint8).reshape(-1, 8)
+        bits = np.unpackbits(packed, axis=1)[:, 64 - N_length:]
+    else:
+        decimals = [int(decimal) for decimal in decimals]
+        if min(decimals) < 0 or max(decimals) >= 2**N_length:
+            raise ValueError(f"decimals should be between 0 and 2**N={2**N_length}. ")
+        packed = np.frombuffer(
+            b"".join(decimal.to_bytes(row_bytes, "big") for decimal in decimals), dtype=np.uint8
+        ).reshape(-1, row_bytes)
+        bits = np.unpackbits(packed, axis=1)[:, 8 * row_bytes - N_length:]
+
+    return np.ascontiguousarray(bits, dtype=dtype)
+
+
+def spins_to_decimals(spins):
+    """Decimals of many spin configurations at once, the inverse of decimals_to_spins.
+
+    Parameters
+    ----------
+    spins : numpy.ndarray
+        K x N_length matrix of spins, every nonzero entry counts as spin up.
+
+    Returns
+    -------
+    decimals : numpy.ndarray
+        The K decimal values, int64 up to N_length = 63, uint64 for N_length = 64 and python integers in
+        an object array beyond.
+
+    Examples
+    --------
+    >>> spins_to_decimals([[0, 0, 0, 0, 1, 0, 1, 0], [1, 1, 1, 1, 1, 1, 1, 1]])
+    array([ 10, 255])
+    """
+    spins = np.asarray(spins)
+    if spins.ndim != 2:
+        raise ValueError(f"spins of shape {spins.shape} should be a K x N_length matrix. ")
+
+    K_configs, N_length = spins.shape
+    row_bytes = (N_length + 7) // 8
+    # np.packbits fills the last byte from its high bits, the low padding bits are zero
+    packed = np.packbits(spins != 0, axis=1)
+    padding = 8 * row_bytes - N_length
+
+    if N_length <= 64:
+        words = np.zeros((K_configs, 8), dtype=np.uint8)
+        words[:, 8 - row_bytes:] = packed
+        decimals = words.view(">u8").ravel() >> np.uint64(padding)
+        return decimals.astype(np.uint64 if N_length == 64 else np.int64)
+
+    decimals = np.empty(K_configs, dtype=object)
+    decimals[:] = [int.from_bytes(row.tobytes(), "big") >> padding for row in packed]
+    return decimals
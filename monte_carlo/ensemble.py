@@ -0,0 +1,284 @@
+"""
+SpinEnsemble class, K independent 1-d Ising chains advanced in lockstep with NumPy
+"""
+
+import numpy as np
+
+from .exact import _macrostate_energy
+from .rng import make_rng
+from .spinconfig import SpinConfig
+from .statistics import RunningStats
+
+
+class SpinEnsemble:
+    def __init__(self, N_length=10, K_chains=1000, rng=None):
+        """Create an ensemble of K_chains independent 1-d Ising models of length N_length.
+
+        The spins are held in a (K_chains, N_length) int8 array, '0' represents: spin down. '1' represents:
+        spin up, and every sampling step draws one proposal per chain in a single NumPy call.
+
+        Parameters
+        ----------
+        N_length: integer , optional
+            Length of every chain.
+        K_chains: integer , optional
+            Number of independent chains.
+        rng: int, numpy.random.SeedSequence or numpy.random.Generator, optional
+            Seed or generator of the random numbers of every chain, see make_rng, default None draws fresh
+            entropy.
+
+        Returns
+        -------
+        SpinEnsemble : class
+            An ensemble of K_chains spin configurations.
+
+        Examples
+        --------
+        >>> myensemble = SpinEnsemble(8, 1000)
+        >>> myensemble.spins.shape
+        (1000, 8)
+        """
+        self.N_length = N_length
+        self.K_chains = K_chains
+        self.spins = np.zeros((self.K_chains, self.N_length), dtype=np.int8)
+        self.rng = make_rng(rng)
+
+    # spins initialization
+    def init_rand_spins(self):
+        """Initialize every chain with independent random spins.
+
+        Returns
+        -------
+        self.spins : numpy.ndarray
+            A (K_chains, N_length) int8 array of 0 and 1.
+        """
+        self.spins = self.rng.integers(0, 2, size=(self.K_chains, self.N_length), dtype=np.int8)
+
+        return self.spins
+
+    # spins properties:
+    def magnetization(self):
+        """Calculate the magnetization of every chain.
+
+        Returns
+        -------
+        magnet : numpy.ndarray
+            Magnetization of every chain, shape (K_chains,).
+        """
+        self.magnet = 2 * self.spins.sum(axis=1, dtype=np.int64) - self.N_length
+
+        return self.magnet
+
+    def hamiltonian(self, J=-2, u=1.1):
+        """Calculate the energy of every chain, identical to SpinConfig.hamiltonian row by row.
+
+        Parameters
+        ----------
+        J: float, optional
+            Coupling parameter, default J=-2 .
+        u: float, optional
+            External field strength, default u=1.1 .
+
+        Returns
+        -------
+        energy : numpy.ndarray
+            Energy of every chain, shape (K_chains,).
+        """
+        self.J = J
+        self.u = u
+        walls = (self.spins != np.roll(self.spins, -1, axis=1)).sum(axis=1)
+        self.energy = _macrostate_energy(self.N_length, self.magnetization(), walls, self.J, self.u)
+
+        return self.energy
+
+    # Observable
+    def observable_metropolis_sampling(self, T=10, sample_size_M=10000, u=1.1, J=-2):
+        """
+        Simulated averaged energy, magnetization, heat Capacity and magnetic susceptbility
+         of every chain with sample_size_M Metropolis steps under temperature T.
+
+        Every step proposes one random site per chain and applies the accepted flips with a mask,
+        so the interpreter overhead is shared by the whole ensemble. A rejected proposal counts as
+        a step that records the current state again.
+
+        Parameters
+        ----------
+        T : float, optional
+            Temperature
+        sample_size_M : int
+            Number of Metropolis steps of every chain, default sample_size_M = 10000
+        u: float, optional
+            External field strength, default u=1.1
+        J: float, optional
+            Coupling parameter, default J=-2
+
+        Returns
+        -------
+        E, m, C, ms : set of numpy.ndarray
+            Average energy, average magnetism, heat capacibility, magnetic susceptbility of every chain.
+
+        Examples
+        --------
+        >>> myensemble = SpinEnsemble(8, 1000)
+        >>> E, m, C, ms = myensemble.observable_metropolis_sampling()
+        >>> E.mean(), E.std() / np.sqrt(len(E))
+        (-3.67597868, 0.00403669)
+        """
+
+        self.J = J
+        self.u = u
+
+        # tables indexed by [spin, up_neighbors], shared with the single chain sampler
+        spin_config = SpinConfig(self.N_length)
+        dE_table = spin_config.delta_energy_table(self.J, self.u)
+        acceptance = spin_config.acceptance_table(T, self.J, self.u)
+
+        self.init_rand_spins()
+        E_metro_sample = self.hamiltonian(self.J, self.u)
+        m_metro_sample = self.magnetization()
+
+        self.E_stats = RunningStats()
+        self.m_stats = RunningStats()
+        self.E_stats.add(E_metro_sample)
+        self.m_stats.add(m_metro_sample)
+
+        chains = np.arange(self.K_chains)
+        for j in range(1, sample_size_M):
+            sites = self.rng.integers(0, self.N_length, size=self.K_chains)
+            spin = self.spins[chains, sites]
+            up_neighbors = self.spins[chains, sites - 1] + self.spins[chains, (sites + 1) % self.N_length]
+
+            # decision
+            accepted = self.rng.random(self.K_chains) < acceptance[spin, up_neighbors]
+            self.spins[chains[accepted], sites[accepted]] ^= 1
+            E_metro_sample = E_metro_sample + accepted * dE_table[spin, up_neighbors]
+            m_metro_sample = m_metro_sample + accepted * (2 - 4 * spin.astype(np.int64))
+
+            self.E_stats.add(E_metro_sample)
+            self.m_stats.add(m_metro_sample)
+
+        self.energy = E_metro_sample
+        self.magnet = m_metro_sample
+
+        # average to get the simulated observables of every chain
+        self.E_metropolis = self.E_stats.mean
+        self.m_metropolis = self.m_stats.mean
+        self.C_metropolis = self.E_stats.variance / (T * T)
+        self.ms_metropolis = self.m_stats.variance / (T)
+
+        return (
+            self.E_metropolis,
+            self.m_metropolis,
+            self.C_metropolis,
+            self.ms_metropolis,
+        )
+
+    def _sublattices(self):
+        """Split the sites into sets without nearest neighbors inside a set (periodic chain)."""
+        if self.N_length == 1:
+            return [np.array([0])]
+        if self.N_length % 2 == 0:
+            return [np.arange(0, self.N_length, 2), np.arange(1, self.N_length, 2)]
+        # on an odd ring the last site neighbors site 0, so it gets its own set
+        return [np.arange(0, self.N_length - 1, 2), np.arange(1, self.N_length - 1, 2), np.array([self.N_length - 1])]
+
+    def _sweep(self, dE_table, flip_probability):
+        """Update every sublattice of every chain once with the flip probabilities of a (2, 3) table,
+        or of a (K_chains, 2, 3) table with one row per chain, and return the energy and magnetization changes."""
+        flip_probability = np.broadcast_to(flip_probability, (self.K_chains, 2, 3))
+        chains = np.arange(self.K_chains)[:, np.newaxis]
+
+        dE = np.zeros(self.K_chains)
+        dm = np.zeros(self.K_chains, dtype=np.int64)
+        for sites in self._sublattices():
+            spin = self.spins[:, sites]
+            up_neighbors = self.spins[:, sites - 1] + self.spins[:, (sites + 1) % self.N_length]
+
+            # decision
+            flipped = self.rng.random(spin.shape) < flip_probability[chains, spin, up_neighbors]
+            self.spins[:, sites] = spin ^ flipped
+            dE += (flipped * dE_table[spin, up_neighbors]).sum(axis=1)
+            dm += (flipped * (2 - 4 * spin.astype(np.int64))).sum(axis=1)
+
+        return dE, dm
+
+    def observable_sweep_sampling(self, T=10, sweeps=1000, u=1.1, J=-2, update="metropolis"):
+        """
+        Simulated averaged energy, magnetization, heat Capacity and magnetic susceptbility
+         of every chain with checkerboard sweeps under temperature T.
+
+        Sites of one sublattice (all even or all odd sites) have no bond between each other, so a
+        whole sublattice of every chain is updated in one NumPy pass without breaking detailed balance.
+        One sweep updates every site once and records one sample.
+
+        Parameters
+        ----------
+        T : float, optional
+            Temperature
+        sweeps : int
+            Number of sweeps of every chain, default sweeps = 1000
+        u: float, optional
+            External field strength, default u=1.1
+        J: float, optional
+            Coupling parameter, default J=-2
+        update: str, optional
+            'metropolis' flips with probability min(1, exp(-dE/T)), 'heat_bath' draws every spin from
+            its local Boltzmann distribution, default update = 'metropolis'
+
+        Returns
+        -------
+        E, m, C, ms : set of numpy.ndarray
+            Average energy, average magnetism, heat capacibility, magnetic susceptbility of every chain.
+
+        Examples
+        --------
+        >>> myensemble = SpinEnsemble(8, 1000)
+        >>> E, m, C, ms = myensemble.observable_sweep_sampling(update="heat_bath")
+        >>> E.mean()
+        -3.6771
+        """
+        if update not in ("metropolis", "heat_bath"):
+            raise ValueError(f"update({update}) should be 'metropolis' or 'heat_bath'. ")
+
+        self.J = J
+        self.u = u
+
+        spin_config = SpinConfig(self.N_length)
+        dE_table = spin_config.delta_energy_table(self.J, self.u)
+        if update == "metropolis":
+            flip_probability = spin_config.acceptance_table(T, self.J, self.u)
+        else:
+            # probability of an up spin given the number of up neighbors, dE_table[0] is E(up) - E(down)
+            heat_bath_up = 1.0 / (1.0 + np.exp(dE_table[0] / T))
+            flip_probability = np.array([heat_bath_up, 1.0 - heat_bath_up])
+
+        self.init_rand_spins()
+        E_metro_sample = self.hamiltonian(self.J, self.u)
+        m_metro_sample = self.magnetization()
+
+        self.E_stats = RunningStats()
+        self.m_stats = RunningStats()
+
+        for sweep in range(sweeps):
+            dE, dm = self._sweep(dE_table, flip_probability)
+            E_metro_sample = E_metro_sample + dE
+            m_metro_sample = m_metro_sample + dm
+
+            self.E_stats.add(E_metro_sample)
+            self.m_stats.add(m_metro_sample)
+
+        self.energy = E_metro_sample
+        self.magnet = m_metro_sample
+
+        # average to get the simulated observables of every chain
+        self.E_metropolis = self.E_stats.mean
+        self.m_metropolis = self.m_stats.mean
+        self.C_metropolis = self.E_stats.variance / (T * T)
+        self.ms_metropolis = self.m_stats.variance / (T)
+
+        return (
+            self.E_metropolis,
+            self.m_metropolis,
+            self.C_metropolis,
+            self.ms_metropolis,
+        )
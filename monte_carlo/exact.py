@@ -0,0 +1,388 @@
+"""
+Exact observables of the periodic 1-d Ising chain from its 2x2 transfer matrix
+"""
+
+import functools
+import os
+
+import numpy as np
+
+from ._atomic import _atomic_open
+from .statistics import RunningStats
+
+
+def _term_derivatives(a, b, c, D, t1, t2, coefficients):
+    """First and second derivatives (a', D', a'', D'') of a and D along one parameter.
+
+    a = (t1 + t2)/2, b = (t1 - t2)/2 and c are exponentials whose logarithms change with the parameter
+    at the rates in coefficients. D'' is written without the difference of D' squared, so derivatives
+    that are small because every rate of a dominant term is 0 stay accurate.
+    """
+    alpha_1, alpha_2, alpha_3 = coefficients
+    a_1 = 0.5 * (alpha_1 * t1 + alpha_2 * t2)
+    b_1 = 0.5 * (alpha_1 * t1 - alpha_2 * t2)
+    a_2 = 0.5 * (alpha_1 * alpha_1 * t1 + alpha_2 * alpha_2 * t2)
+    b_2 = 0.5 * (alpha_1 * alpha_1 * t1 - alpha_2 * alpha_2 * t2)
+
+    # D**2 = b**2 + c with c' = alpha_3 * c
+    D_1 = (b * b_1 + 0.5 * alpha_3 * c) / D
+    D_2 = c * (b_1 - 0.5 * alpha_3 * b) ** 2 / D**3 + (b * b_2 + 0.25 * alpha_3 * alpha_3 * c) / D
+
+    return a_1, D_1, a_2, D_2
+
+
+def _eigenvalue_derivatives(beta, J, u):
+    """Eigenvalues of the transfer matrix and their first and second derivatives in beta and u.
+
+    The transfer matrix exp(beta*J*s*s' - beta*u*(s + s')/2) has eigenvalues lambda = a +- D with
+    a = (t1 + t2)/2, D = sqrt(b**2 + c), b = (t1 - t2)/2, t1 = exp(beta*(J + u)), t2 = exp(beta*(J - u))
+    and c = exp(-2*beta*J). The energy and magnetization are measured from the ground state, whose
+    energy per site -e_0 and magnetization per site -m_0 belong to the largest of the exponents: this
+    scales everything by exp(-K), with K the largest exponent, so that low temperatures do not overflow,
+    and makes the derivatives the small deviations from the ground state, so that the variances do not
+    cancel. Returns a, D, the derivatives (a', D', a'', D'') along beta and along u, e_0 and m_0.
+    """
+    e_0 = np.maximum(J + np.abs(u), -J)
+    # the ferromagnetic ground state is aligned against the field, the antiferromagnetic one has m = 0
+    m_0 = np.where(J + np.abs(u) >= -J, np.where(u >= 0, 1.0, -1.0), 0.0)
+
+    K = beta * e_0
+    t1 = np.exp(beta * (J + u) - K)
+    t2 = np.exp(beta * (J - u) - K)
+    c = np.exp(-2 * beta * J - 2 * K)
+    a = 0.5 * (t1 + t2)
+    b = 0.5 * (t1 - t2)
+    D = np.sqrt(b * b + c)
+
+    # rates of the logarithms of t1, t2 and c relative to the ground state, 0 for the dominant term
+    beta_coefficients = (J + u - e_0, J - u - e_0, -2 * J - 2 * e_0)
+    u_coefficients = (beta * (1 - m_0), beta * (-1 - m_0), -2 * beta * m_0)
+
+    d_beta = _term_derivatives(a, b, c, D, t1, t2, beta_coefficients)
+    d_u = _term_derivatives(a, b, c, D, t1, t2, u_coefficients)
+
+    return a, D, d_beta, d_u, e_0, m_0
+
+
+def _power_sums(a, D, k):
+    """Return 1 + r**k and 1 - r**k for r = (a - D)/(a + D) without cancellation when |r| is close to 1."""
+    if k == 0:
+        return 2 * np.ones_like(a), np.zeros_like(a)
+
+    # log|r| = log1p(-2*min(a, D)/(a + D)), r is negative when a < D
+    with np.errstate(divide="ignore"):
+        log_r = np.log1p(-2 * np.minimum(a, D) / (a + D))
+    r_k = np.exp(k * log_r)
+    one_minus = -np.expm1(k * log_r)
+    if k % 2 == 1:
+        return np.where(a < D, one_minus, 1 + r_k), np.where(a < D, 1 + r_k, one_minus)
+
+    return 1 + r_k, one_minus
+
+
+def _log_partition_derivatives(N_length, a, D, derivatives):
+    """First and second derivative of ln Z = ln(lambda_+**N + lambda_-**N) along one parameter.
+
+    With lambda_+- = a +- D, the powers of r = lambda_-/lambda_+ only enter through 1 + r**k and
+    1 - r**k, which keeps nearly degenerate eigenvalues (ordered low temperature phases) accurate.
+    """
+    a_1, D_1, a_2, D_2 = derivatives
+    lam_p = a + D
+    norm, _ = _power_sums(a, D, N_length)
+    plus, minus = _power_sums(a, D, N_length - 1)
+
+    first = N_length * (a_1 * plus + D_1 * minus) / (lam_p * norm)
+    second = N_length * (a_2 * plus + D_2 * minus) / (lam_p * norm) - first * first
+    if N_length > 1:
+        plus, minus = _power_sums(a, D, N_length - 2)
+        second = second + N_length * (N_length - 1) * ((a_1 * a_1 + D_1 * D_1) * plus + 2 * a_1 * D_1 * minus) / (
+            lam_p * lam_p * norm
+        )
+
+    return first, second
+
+
+def transfer_matrix_observables(N_length, T=10, J=-2, u=1.1):
+    """Calculate the exact observables of the periodic 1-d Ising chain with the transfer matrix method.
+
+    ln Z = ln(lambda_+**N + lambda_-**N) and its derivatives are evaluated in closed form, so the cost
+    does not depend on N_length. The results agree with SpinConfig.observable_theory, which enumerates
+    all 2**N_length states. Temperatures below about |J|/350 underflow in double precision.
+
+    Parameters
+    ----------
+    N_length : integer
+        Length of the chain.
+    T : float or numpy.ndarray, optional
+        Temperature, arrays are evaluated element-wise.
+    J: float, optional
+        Coupling parameter, default J=-2 .
+    u: float, optional
+        External field strength, default u=1.1 .
+
+    Returns
+    -------
+    E, m, C, ms : set
+        Expectation of energy, average magnetism, heat capacibility, magnetic susceptbility.
+
+    Examples
+    --------
+    >>> transfer_matrix_observables(8)
+    (-3.6772068591549, -0.5894627003462392, 0.3259341570934049, 0.5351140013397602)
+    """
+    T = np.asarray(T, dtype=float)
+    beta = 1.0 / T
+    a, D, d_beta, d_u, e_0, m_0 = _eigenvalue_derivatives(beta, J, u)
+
+    # derivatives of ln Z with the energy and magnetization measured from the ground state
+    lnZ_b, lnZ_bb = _log_partition_derivatives(N_length, a, D, d_beta)
+    lnZ_u, lnZ_uu = _log_partition_derivatives(N_length, a, D, d_u)
+
+    # E = -d lnZ/d beta, <M> = -d lnZ/d u / beta, Var(E) = d2 lnZ/d beta2, Var(M) = d2 lnZ/d u2 / beta**2
+    E = -N_length * e_0 - lnZ_b
+    m = -N_length * m_0 - lnZ_u / beta
+    # odd frustrated antiferromagnetic chains have no ground state at -N*e_0 and can still round below 0
+    C = np.maximum(0.0, lnZ_bb) / (T * T)
+    ms = np.maximum(0.0, lnZ_uu) / beta
+
+    if T.ndim == 0:
+        return float(E), float(m), float(C), float(ms)
+
+    return E, m, C, ms
+
+
+def _macrostate_energy(N_length, magnet, n_walls, J, u):
+    """Energy of periodic chains with magnetization magnet and n_walls domain walls, broadcast over arrays."""
+    # every parallel bond contributes -J and every anti-parallel bond (domain wall) +J
+    return u * magnet - J * (N_length - 2 * n_walls)
+
+
+def density_of_states_observables(g, T=10, J=-2, u=1.1):
+    """Calculate exact observables for many temperatures at once from the joint density of states.
+
+    The energy of a periodic chain only depends on the number of up spins and of domain walls, so the
+    Boltzmann weights of every temperature are broadcast over the (N_length + 1) x (N_length + 1) table
+    g instead of over all 2**N_length states.
+
+    Parameters
+    ----------
+    g : numpy.ndarray
+        g[n_up, n_walls] is the number of spin configurations with n_up up spins and n_walls domain walls.
+    T : float or numpy.ndarray, optional
+        Temperature, arrays are evaluated in one broadcasted pass.
+    J: float, optional
+        Coupling parameter, default J=-2 .
+    u: float, optional
+        External field strength, default u=1.1 .
+
+    Returns
+    -------
+    E, m, C, ms : set
+        Expectation of energy, average magnetism, heat capacibility, magnetic susceptbility, with the
+        shape of T.
+    """
+    g = np.asarray(g, dtype=float)
+    N_length = g.shape[0] - 1
+    n_up, n_walls = np.nonzero(g)
+    magnet = 2 * n_up - N_length
+    energy = _macrostate_energy(N_length, magnet, n_walls, J, u)
+
+    return _canonical_observables(np.log(g[n_up, n_walls]), energy, magnet, T)
+
+
+def _canonical_observables(log_g, energy, magnet, T):
+    """Canonical E, m, C, ms of macrostates with log multiplicity log_g, broadcast over the shape of T."""
+    T = np.asarray(T, dtype=float)
+    beta = 1.0 / T[..., np.newaxis]
+
+    # log-sum-exp over the macrostates of every temperature
+    log_weights = log_g - beta * (energy - energy.min())
+    weights = np.exp(log_weights - log_weights.max(axis=-1, keepdims=True))
+
+    # the macrostates are a weighted sample of the canonical ensemble, reduced like a simulation
+    E_stats = RunningStats()
+    m_stats = RunningStats()
+    E_stats.add_batch(energy, weights, axis=-1)
+    m_stats.add_batch(magnet, weights, axis=-1)
+
+    E = E_stats.mean
+    m = m_stats.mean
+    C = E_stats.variance / (T * T)
+    ms = m_stats.variance / T
+
+    if T.ndim == 0:
+        return float(E), float(m), float(C), float(ms)
+
+    return E, m, C, ms
+
+
+def _popcount_array(x):
+    """Number of set bits of every element of a uint64 array (SWAR bit counting)."""
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def _enumerated_states(N_length, J, u, chunk_size):
+    """Energies and magnetizations of all 2**N_length configurations, chunk_size decimals at a time."""
+    mask = np.uint64(2**N_length - 1)
+    for start in range(0, 2**N_length, chunk_size):
+        decimals = np.arange(start, min(start + chunk_size, 2**N_length), dtype=np.uint64)
+        rotated = ((decimals << np.uint64(1)) | (decimals >> np.uint64(N_length - 1))) & mask
+
+        magnet = 2 * _popcount_array(decimals) - N_length
+        n_walls = _popcount_array(decimals ^ rotated)
+        yield _macrostate_energy(N_length, magnet, n_walls, J, u), magnet
+
+
+def enumeration_observables(N_length, T=10, J=-2, u=1.1, chunk_size=2**16):
+    """Calculate exact observables by enumerating every spin configuration, a reference for small chains.
+
+    The energies and magnetizations of all 2**N_length configurations are built with bit operations
+    on np.arange, chunk_size configurations at a time, and reduced like a weighted simulation. It does
+    not use the density of states or the transfer matrix, so it checks both independently; the cost
+    grows as 2**N_length, so N_length should stay below about 30.
+
+    Parameters
+    ----------
+    N_length : integer
+        Length of the chain, at most 63.
+    T : float or numpy.ndarray, optional
+        Temperature, arrays are evaluated in one broadcasted pass.
+    J: float, optional
+        Coupling parameter, default J=-2 .
+    u: float, optional
+        External field strength, default u=1.1 .
+    chunk_size: integer, optional
+        Number of spin configurations evaluated per NumPy pass, default chunk_size=2**16 .
+
+    Returns
+    -------
+    E, m, C, ms : set
+        Expectation of energy, average magnetism, heat capacibility, magnetic susceptbility, with the
+        shape of T.
+
+    Examples
+    --------
+    >>> enumeration_observables(8, 10, -2, 1.1)
+    (-3.6772068591549005, -0.5894627003462394, 0.3259341570934053, 0.5351140013397605)
+    """
+    if not 1 <= N_length <= 63:
+        raise ValueError(f"N_length({N_length}) should be between 1 and 63 to be enumerated. ")
+
+    T = np.asarray(T, dtype=float)
+    beta = 1.0 / T[..., np.newaxis]
+
+    # Boltzmann weights relative to the ground state of a first pass never overflow
+    E_min = min(energy.min() for energy, magnet in _enumerated_states(N_length, J, u, chunk_size))
+
+    E_stats = RunningStats()
+    m_stats = RunningStats()
+    for energy, magnet in _enumerated_states(N_length, J, u, chunk_size):
+        weights = np.exp(-beta * (energy - E_min))
+        E_stats.add_batch(energy, weights, axis=-1)
+        m_stats.add_batch(magnet, weights, axis=-1)
+
+    E = E_stats.mean
+    m = m_stats.mean
+    C = E_stats.variance / (T * T)
+    ms = m_stats.variance / T
+
+    if T.ndim == 0:
+        return float(E), float(m), float(C), float(ms)
+
+    return E, m, C, ms
+
+
+def _binomial_row(n):
+    """Binomial coefficients C(n, 0), ..., C(n, n) as exact python integers."""
+    row = [1]
+    for j in range(n):
+        row.append(row[-1] * (n - j) // (j + 1))
+    return row
+
+
+@functools.lru_cache(maxsize=64)
+def _density_of_states(N_length):
+    """Combinatorial g[n_up, n_walls] of a periodic chain, cached in process and read-only."""
+    if N_length > 1020:
+        raise ValueError(
+            f"density of states of N_length={N_length} exceeds the float range, use transfer_matrix_observables. "
+        )
+
+    g = np.zeros((N_length + 1, N_length + 1))
+    # without domain walls the chain is all down or all up
+    g[0, 0] = 1
+    g[N_length, 0] = 1
+    # n_up up spins in r runs alternating with N - n_up down spins in r runs make 2r domain walls,
+    # there are N/r * C(n_up - 1, r - 1) * C(N - n_up - 1, r - 1) such labelled rings
+    for n_up in range(1, N_length):
+        up_row = _binomial_row(n_up - 1)
+        down_row = _binomial_row(N_length - n_up - 1)
+        for r in range(1, min(n_up, N_length - n_up) + 1):
+            g[n_up, 2 * r] = N_length * up_row[r - 1] * down_row[r - 1] // r
+
+    g.flags.writeable = False
+    return g
+
+
+def density_of_states(N_length, cache_dir=None):
+    """Joint density of states of the periodic 1-d Ising chain.
+
+    The energy u*(2*n_up - N) - J*(N - 2*n_walls) only depends on the number of up spins and of domain
+    walls, so g is computed once per N_length and reused for any J, u and T. Results are kept in an
+    in-process LRU cache and, if cache_dir is given, in a .npy file per N_length that is read at most
+    once per process.
+
+    Parameters
+    ----------
+    N_length : integer
+        Length of the chain, at most 1020 so that every count fits in a float.
+    cache_dir : str, optional
+        Directory of the on-disk cache, default None does not touch the disk.
+
+    Returns
+    -------
+    g : numpy.ndarray
+        Read-only array of shape (N_length + 1, N_length + 1), g[n_up, n_walls] is the number of spin
+        configurations with n_up up spins and n_walls domain walls.
+
+    Examples
+    --------
+    >>> density_of_states(4)
+    array([[1., 0., 0., 0., 0.],
+           [0., 0., 4., 0., 0.],
+           [0., 0., 4., 0., 2.],
+           [0., 0., 4., 0., 0.],
+           [1., 0., 0., 0., 0.]])
+    """
+    if cache_dir is None:
+        return _density_of_states(N_length)
+
+    return _disk_density_of_states(N_length, os.fspath(cache_dir))
+
+
+@functools.lru_cache(maxsize=64)
+def _disk_density_of_states(N_length, cache_dir):
+    """density_of_states through the .npy file of cache_dir, read at most once per process.
+
+    A file that cannot be read or does not hold a (N_length + 1, N_length + 1) float table (e.g. a
+    truncated or stale one) is replaced by a recomputed table.
+    """
+    path = os.path.join(cache_dir, f"dos_N{N_length}.npy")
+    if os.path.exists(path):
+        try:
+            g = np.load(path)
+        except (OSError, ValueError):
+            g = None
+        if g is not None and g.shape == (N_length + 1, N_length + 1) and g.dtype == np.float64:
+            g.flags.writeable = False
+            return g
+
+    g = _density_of_states(N_length)
+    os.makedirs(cache_dir, exist_ok=True)
+    with _atomic_open(path) as handle:
+        np.save(handle, g)
+
+    return g
@@ -0,0 +1,105 @@
+"""
+SiteClasses class, bookkeeping of the rejection-free n-fold way (BKL) kinetic Monte Carlo
+"""
+
+from .rng import make_rng
+
+
+class SiteClasses:
+    def __init__(self, spins, rng=None):
+        """Group the sites of a periodic chain into the 6 classes (spin, up_neighbors) of equal dE.
+
+        Every class keeps an unordered list of its sites and every site its position in that list,
+        so moving a site between classes and drawing a uniform site of a class are both O(1).
+
+        Parameters
+        ----------
+        spins : list
+            A binary spinlist, '0' represents: spin down. '1' represents: spin up. It is updated in place
+            by flip().
+        rng: numpy.random.Generator, optional
+            Generator of the random numbers of select(), default None draws fresh entropy.
+
+        Returns
+        -------
+        SiteClasses : class
+            The class membership of every site.
+
+        Examples
+        --------
+        >>> myclasses = SiteClasses([0, 0, 0, 0, 1, 0, 1, 0])
+        >>> myclasses.counts()
+        [3, 2, 1, 2, 0, 0]
+        """
+        self.spins = spins
+        self.rng = make_rng(rng)
+        self.N_length = len(spins)
+        self.site_class = [0] * self.N_length
+        self.position = [0] * self.N_length
+        self.members = [[] for c in range(6)]
+
+        for site in range(self.N_length):
+            c = self._class_of(site)
+            self.site_class[site] = c
+            self.position[site] = len(self.members[c])
+            self.members[c].append(site)
+
+    def _class_of(self, site):
+        """Class index 3 * spin + up_neighbors of a site."""
+        up_neighbors = self.spins[site - 1] + self.spins[(site + 1) % self.N_length]
+        return 3 * self.spins[site] + up_neighbors
+
+    def _move(self, site, c):
+        """Move site into class c, filling its old slot with the last member of the old class."""
+        old_members = self.members[self.site_class[site]]
+        last = old_members.pop()
+        if last != site:
+            old_members[self.position[site]] = last
+            self.position[last] = self.position[site]
+
+        self.site_class[site] = c
+        self.position[site] = len(self.members[c])
+        self.members[c].append(site)
+
+    def counts(self):
+        """Number of sites of every class."""
+        return [len(members) for members in self.members]
+
+    def flip(self, site):
+        """Flip the spin on site and re-classify it and its two nearest neighbors."""
+        self.spins[site] = 1 - self.spins[site]
+        for neighbor in {site, (site - 1) % self.N_length, (site + 1) % self.N_length}:
+            c = self._class_of(neighbor)
+            if c != self.site_class[neighbor]:
+                self._move(neighbor, c)
+
+    def select(self, rates):
+        """Draw a site with probability proportional to the rate of its class.
+
+        Parameters
+        ----------
+        rates : list
+            Flip rate of every class.
+
+        Returns
+        -------
+        site, total_rate : set
+            The selected site and the total flip rate of the configuration, site is None when every
+            rate is zero.
+        """
+        class_rates = [len(members) * rate for members, rate in zip(self.members, rates)]
+        total_rate = sum(class_rates)
+        if total_rate <= 0:
+            return None, 0.0
+
+        # falls back to the last class with a positive rate if rounding runs past the end
+        target = self.rng.random() * total_rate
+        for c, class_rate in enumerate(class_rates):
+            if class_rate > 0:
+                selected = c
+                if target < class_rate:
+                    break
+            target -= class_rate
+
+        members = self.members[selected]
+        return members[self.rng.integers(0, len(members))], total_rate
@@ -0,0 +1,137 @@
+"""
+Single and multiple histogram (Ferrenberg-Swendsen / WHAM) reweighting of sampled (E, m) histograms
+
+The coupling and the field stay those of the runs; only the temperature is reweighted. A histogram is the
+set (energy, magnet, counts) of the distinct macrostates visited by a run and how often each was visited.
+"""
+
+import numpy as np
+
+from .exact import _canonical_observables
+
+
+def _log_sum_exp(a, axis=-1):
+    """log(sum(exp(a))) along axis without overflow."""
+    a_max = np.max(a, axis=axis, keepdims=True)
+    return np.squeeze(a_max, axis=axis) + np.log(np.exp(a - a_max).sum(axis=axis))
+
+
+def energy_histogram(E_series, m_series):
+    """Joint histogram of the (E, m) macrostates of a sampled time series.
+
+    Parameters
+    ----------
+    E_series : numpy.ndarray
+        Energy of every sample.
+    m_series : numpy.ndarray
+        Magnetization of every sample.
+
+    Returns
+    -------
+    energy, magnet, counts : set of numpy.ndarray
+        Distinct macrostates and the number of samples in each.
+
+    Examples
+    --------
+    >>> energy_histogram([-4.0, -4.0, 2.0], [0, 0, 2])
+    (array([-4.,  2.]), array([0., 2.]), array([2, 1]))
+    """
+    # energies are sums of a few table entries, rounding merges copies that differ in the last bits
+    macrostates = np.column_stack([np.round(np.asarray(E_series, dtype=float), 9), np.asarray(m_series, dtype=float)])
+    unique_states, counts = np.unique(macrostates, axis=0, return_counts=True)
+
+    return unique_states[:, 0], unique_states[:, 1], counts
+
+
+def single_histogram_reweighting(energy, magnet, counts, T_sample, T_list):
+    """Observables at the temperatures T_list from one histogram sampled at T_sample.
+
+    The counts estimate g(E, m) * exp(-E / T_sample), so exp(-E * (1/T - 1/T_sample)) carries them to T.
+    The estimate is only reliable where the energy distribution at T overlaps the sampled one.
+
+    Parameters
+    ----------
+    energy, magnet, counts : numpy.ndarray
+        Histogram of the run, e.g. from energy_histogram.
+    T_sample : float
+        Temperature of the run.
+    T_list : float or numpy.ndarray
+        Temperatures to reweight to.
+
+    Returns
+    -------
+    E, m, C, ms : set
+        Average energy, average magnetism, heat capacibility, magnetic susceptbility, with the shape of
+        T_list.
+
+    Examples
+    --------
+    >>> import itertools
+    >>> myspin = SpinConfig(8)
+    >>> E_series, m_series = np.array(list(itertools.islice(myspin.metropolis_stream(T=2.0), 10**6))).T
+    >>> histogram = energy_histogram(E_series, m_series)
+    >>> single_histogram_reweighting(*histogram, 2.0, [1.8, 2.0, 2.2])[0]
+    array([-13.59743865, -12.833997  , -12.10090876])
+    """
+    energy = np.asarray(energy, dtype=float)
+    log_g = np.log(np.asarray(counts, dtype=float)) + (energy - energy.min()) / T_sample
+
+    return _canonical_observables(log_g, energy, np.asarray(magnet, dtype=float), T_list)
+
+
+def multi_histogram_reweighting(histograms, T_samples, T_list, tolerance=1e-10, max_iterations=10000):
+    """Observables at the temperatures T_list from histograms of several runs (Ferrenberg-Swendsen / WHAM).
+
+    The runs are combined into one density of states by iterating the WHAM equations
+    g(s) = sum_k H_k(s) / sum_k N_k exp(f_k - E(s) / T_k) and f_k = -log sum_s g(s) exp(-E(s) / T_k)
+    until the free energies f_k change by less than tolerance. Every sample counts as independent, so
+    runs of very different autocorrelation times should be thinned first.
+
+    Parameters
+    ----------
+    histograms : list of set
+        One histogram (energy, magnet, counts) per run, e.g. from energy_histogram.
+    T_samples : list of float
+        Temperature of every run.
+    T_list : float or numpy.ndarray
+        Temperatures to reweight to.
+    tolerance : float, optional
+        Convergence threshold of the free energies, default tolerance = 1e-10
+    max_iterations : int, optional
+        Upper bound of self-consistent iterations, default max_iterations = 10000
+
+    Returns
+    -------
+    E, m, C, ms : set
+        Average energy, average magnetism, heat capacibility, magnetic susceptbility, with the shape of
+        T_list.
+    """
+    if len(histograms) != len(T_samples):
+        raise ValueError(f"histograms({len(histograms)}) and T_samples({len(T_samples)}) should have equal length. ")
+
+    # union of the macrostates of every run
+    macrostates = np.concatenate([np.column_stack([energy, magnet]) for energy, magnet, counts in histograms])
+    unique_states, inverse = np.unique(macrostates, axis=0, return_inverse=True)
+    energy, magnet = unique_states[:, 0], unique_states[:, 1]
+    total_counts = np.bincount(
+        np.ravel(inverse), weights=np.concatenate([counts for energy_k, magnet_k, counts in histograms])
+    )
+
+    beta = 1.0 / np.asarray(T_samples, dtype=float)[:, np.newaxis]
+    log_N = np.log([np.sum(counts) for energy_k, magnet_k, counts in histograms])[:, np.newaxis]
+    reduced_energy = beta * (energy - energy.min())
+
+    f = np.zeros((len(histograms), 1))
+    for iteration in range(max_iterations):
+        log_g = np.log(total_counts) - _log_sum_exp(log_N + f - reduced_energy, axis=0)
+        f_new = -_log_sum_exp(log_g - reduced_energy, axis=-1)[:, np.newaxis]
+        # only differences of free energies are defined
+        f_new -= f_new[0]
+
+        converged = np.max(np.abs(f_new - f)) < tolerance
+        f = f_new
+        if converged:
+            break
+
+    log_g = np.log(total_counts) - _log_sum_exp(log_N + f - reduced_energy, axis=0)
+    return _canonical_observables(log_g, energy, magnet, T_list)
@@ -0,0 +1,200 @@
+"""
+Random number generators of the samplers: injectable numpy Generators, independent parallel streams
+and pre-generated blocks of proposals
+"""
+
+import json
+
+import numpy as np
+
+
+def make_rng(seed=None):
+    """numpy.random.Generator of a seed, the argument rng of every sampler.
+
+    Parameters
+    ----------
+    seed : None, int, numpy.random.SeedSequence, numpy.random.BitGenerator or numpy.random.Generator, optional
+        A Generator is used as is, so samplers that share it share one stream; a BitGenerator (e.g.
+        numpy.random.Philox(seed)) is wrapped; anything else seeds a PCG64. Default None draws fresh
+        entropy from the operating system.
+
+    Returns
+    -------
+    rng : numpy.random.Generator
+        The generator.
+
+    Examples
+    --------
+    >>> make_rng(42).integers(0, 8, size=4)
+    array([0, 6, 5, 3])
+    """
+    return np.random.default_rng(seed)
+
+
+def spawn_rngs(seed=None, n_streams=1):
+    """Independent generators for parallel workers, spawned from one numpy.random.SeedSequence.
+
+    Child seed sequences are statistically independent and do not overlap, so every worker (process,
+    thread, chain or grid point) gets its own stream and a computation is reproducible for a given seed
+    regardless of how the streams are scheduled.
+
+    Parameters
+    ----------
+    seed : None, int or numpy.random.SeedSequence, optional
+        Root entropy, default None draws fresh entropy from the operating system.
+    n_streams : int, optional
+        Number of generators, default n_streams = 1
+
+    Returns
+    -------
+    rngs : list of numpy.random.Generator
+        One PCG64 generator per stream.
+
+    Examples
+    --------
+    >>> [rng.integers(0, 8) for rng in spawn_rngs(42, 3)]
+    [3, 0, 5]
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+
+    return [np.random.default_rng(child) for child in seed.spawn(n_streams)]
+
+
+def _plain_state(value):
+    """A bit-generator state with its numpy arrays and integers turned into json types."""
+    if isinstance(value, dict):
+        return {key: _plain_state(entry) for key, entry in value.items()}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def _bit_generator_class(state):
+    """numpy BitGenerator class named by a saved state, refusing anything else."""
+    bit_generator_class = getattr(np.random, str(state.get("bit_generator")), None)
+    if not (isinstance(bit_generator_class, type) and issubclass(bit_generator_class, np.random.BitGenerator)):
+        raise ValueError(f"bit_generator({state.get('bit_generator')}) should be a numpy.random.BitGenerator. ")
+    return bit_generator_class
+
+
+def _rng_state_text(rng):
+    """Bit-generator state of rng as a json string array, for .npz checkpoints that load without pickle."""
+    return np.array(json.dumps(_plain_state(rng.bit_generator.state)))
+
+
+def _rng_from_state_text(state_text):
+    """Generator restored from _rng_state_text, with a bit generator of the saved type."""
+    state = json.loads(str(state_text))
+    bit_generator = _bit_generator_class(state)()
+    bit_generator.state = state
+
+    return np.random.Generator(bit_generator)
+
+
+class RandomBuffer:
+    def __init__(self, rng, n_sites=10, buffer_size=65536):
+        """Pre-generated blocks of proposal sites and acceptance uniforms of a single-flip sampler.
+
+        A scalar call to a numpy Generator costs far more than the random number it returns. The buffer
+        draws buffer_size (site, uniform) pairs with one vectorized call and hands them out from a cursor,
+        refilling when the block is used up. Every pair is made of two consecutive doubles of rng, the
+        first scaled to a site in [0, n_sites), so the sequence of pairs only depends on the state of rng
+        and not on buffer_size.
+
+        Parameters
+        ----------
+        rng : numpy.random.Generator
+            Generator the blocks are drawn from.
+        n_sites : int, optional
+            Number of sites to propose from, default n_sites = 10
+        buffer_size : int, optional
+            Number of pairs per block, default buffer_size = 65536
+
+        Returns
+        -------
+        RandomBuffer : class
+            An empty buffer, filled at the first draw.
+
+        Examples
+        --------
+        >>> buffer = RandomBuffer(make_rng(42), 8)
+        >>> buffer.draw()
+        (6, 0.4388784397520523)
+        """
+        if buffer_size < 1:
+            raise ValueError(f"buffer_size({buffer_size}) should be a positive integer. ")
+
+        self.rng = rng
+        self.n_sites = n_sites
+        self.buffer_size = buffer_size
+
+        self.sites = []
+        self.uniforms = []
+        self.cursor = 0
+        self._refill_state = None
+
+    def refill(self, size=None):
+        """Draw a new block of size pairs, default self.buffer_size, and reset the cursor.
+
+        Returns
+        -------
+        sites, uniforms : set of list
+            The new block, as python lists since samplers index them one element at a time.
+        """
+        if size is None:
+            size = self.buffer_size
+
+        self._refill_state = self.rng.bit_generator.state
+        draws = self.rng.random(2 * size)
+        self.sites = (draws[0::2] * self.n_sites).astype(np.int64).tolist()
+        self.uniforms = draws[1::2].tolist()
+        self.cursor = 0
+
+        return self.sites, self.uniforms
+
+    def draw(self):
+        """Next (site, uniform) pair, refilling the block when it is used up."""
+        if self.cursor == len(self.sites):
+            self.refill()
+
+        k = self.cursor
+        self.cursor += 1
+        return self.sites[k], self.uniforms[k]
+
+    def release(self):
+        """Give the unused pairs of the current block back to self.rng and empty the buffer.
+
+        self.rng ends in the state right after the last pair handed out, as if every draw had been a
+        scalar one, so whatever draws from it next does not depend on buffer_size.
+        """
+        if self._refill_state is not None and self.cursor < len(self.sites):
+            self.rng.bit_generator.state = self._refill_state
+            self.rng.random(2 * self.cursor)
+
+        self.sites, self.uniforms, self.cursor, self._refill_state = [], [], 0, None
+
+    def get_state(self):
+        """Position in the stream as a json string array, for .npz checkpoints.
+
+        Only the generator state before the current block and the cursor are kept, the block itself is
+        drawn again by set_state.
+        """
+        state = {"refill_state": _plain_state(self._refill_state), "size": len(self.sites), "cursor": self.cursor}
+        return np.array(json.dumps(state))
+
+    def set_state(self, state_text):
+        """Continue the stream saved by get_state; self.rng ends in the state it had after the saved block."""
+        state = json.loads(str(state_text))
+        refill_state, size, cursor = state["refill_state"], state["size"], state["cursor"]
+
+        if refill_state is None:
+            self.sites, self.uniforms, self.cursor, self._refill_state = [], [], 0, None
+            return
+
+        _bit_generator_class(refill_state)
+        self.rng.bit_generator.state = refill_state
+        self.refill(size)
+        self.cursor = cursor
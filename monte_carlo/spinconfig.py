@@ -2,18 +2,51 @@
 SpinConfig class and methods for initialization, manipulation and analyzing property
 """
 
+import json
+import os
+import time
+
 import numpy as np
 
+from ._atomic import _atomic_open
+from .analysis import binning_errors, mser_burn_in
+from .cluster import swendsen_wang_update, wolff_update
+from .exact import density_of_states, density_of_states_observables, transfer_matrix_observables
+from .nfold import SiteClasses
+from .rng import RandomBuffer, _rng_from_state_text, _rng_state_text, make_rng
+from .statistics import RunningStats
+
+
+def _flip_energy(spin, up_neighbors, N_length, J, u):
+    """Energy change of flipping spin (0 or 1) with up_neighbors up nearest neighbors on a periodic chain."""
+    sigma = 2 * spin - 1
+
+    # a single site chain couples to itself, so its bond never changes
+    if N_length == 1:
+        return -2 * u * sigma
+
+    return 2 * sigma * (J * (2 * up_neighbors - 2) - u)
+
 
 # def spin configuration class
 class SpinConfig:
-    def __init__(self, N_length=10):
+    def __init__(self, N_length=10, rng=None, buffer_size=65536):
         """Create a class of 1-d Ising model, with length of the spinlist as N_length.
 
+        Every random number of the model and its samplers is drawn from its own numpy.random.Generator
+        self.rng, so models never share state and can run in separate threads or processes. The Metropolis
+        sampler takes its proposal sites and acceptance uniforms from blocks of buffer_size pairs
+        (RandomBuffer) instead of two scalar draws per step; the chain of a seed does not depend on
+        buffer_size.
+
         Parameters
         ----------
         N_length: integer , optional
             Length of the list.
+        rng: int, numpy.random.SeedSequence or numpy.random.Generator, optional
+            Seed or generator of the random numbers, see make_rng, default None draws fresh entropy.
+        buffer_size: int, optional
+            Number of pre-generated Metropolis proposals per block, default buffer_size = 65536
 
         Returns
         -------
@@ -31,6 +64,9 @@ class SpinConfig:
         self.N_length = N_length
         self.iMax = 2**self.N_length
         self.spinlist = []
+        self.rng = make_rng(rng)
+        self.buffer_size = buffer_size
+        self.random_buffer = None
 
     # spinlist initialization
     def init_input_decimal(self, decimal_input):
@@ -53,10 +89,7 @@ class SpinConfig:
         [0, 0, 0, 0, 1, 0, 1, 0]
         """
         if decimal_input < self.iMax:
-            binary_list = [int(element) for element in list(bin(decimal_input)[2:])]
-            while len(binary_list) < self.N_length:
-                binary_list = [0] + binary_list
-            self.spinlist = binary_list
+            self.spinlist = [int(element) for element in format(decimal_input, f"0{self.N_length}b")]
         else:
             raise ValueError(f"input decimal({decimal_input}) exceeds the biggest spinconfig 2**N={self.iMax}. ")
 
@@ -79,7 +112,12 @@ class SpinConfig:
         >>> myspin.init_rand_spinlist()
         [0, 1, 1, 0, 1, 0, 1, 0]
         """
-        return self.init_input_decimal(np.random.randint(0, self.iMax - 1))
+        if self.N_length < 63:
+            return self.init_input_decimal(int(self.rng.integers(0, self.iMax)))
+
+        # iMax exceeds the int64 range of Generator.integers, draw the bits one by one instead
+        random_bits = self.rng.integers(0, 2, size=self.N_length)
+        return self.init_input_decimal(int("".join(str(bit) for bit in random_bits), 2))
 
     # spinlist manipulation:
     def random_flip(self):
@@ -101,7 +139,7 @@ class SpinConfig:
         >>> myspin.random_flip()
         [0, 1, 0, 0, 1, 0, 1, 0]
         """
-        random_site = np.random.randint(0, self.N_length - 1)
+        random_site = int(self.rng.integers(0, self.N_length))
         if self.spinlist[random_site] == 0:
             self.spinlist[random_site] = 1
         else:
@@ -140,6 +178,42 @@ class SpinConfig:
 
         return binary_list2
 
+    def flip(self, site):
+        """Flip the spin on a given site of the spinlist.
+
+        Parameters
+        ----------
+        site : integer
+            Index of the site to flip, in range [0, N_length).
+
+        Returns
+        -------
+        self.spinlist : list
+            The spinlist with the spin on site flipped.
+
+        Examples
+        --------
+        >>> myspin = SpinConfig(8)
+        >>> myspin.init_input_decimal(10)
+        [0, 0, 0, 0, 1, 0, 1, 0]
+        >>> myspin.flip(0)
+        [1, 0, 0, 0, 1, 0, 1, 0]
+        """
+        self._flip(site)
+
+        return self.spinlist
+
+    def _flip(self, site):
+        """Flip the spin on site in place, the primitive used by the samplers."""
+        self.spinlist[site] = 1 - self.spinlist[site]
+
+    def _local_state(self, site):
+        """Return the spin on site and the number of its up nearest neighbors (periodic chain)."""
+        left = self.spinlist[site - 1]
+        right = self.spinlist[(site + 1) % self.N_length]
+
+        return self.spinlist[site], left + right
+
     # spinlist properties:
     def magnetization(self):
         """Calculate the magnetization of the spinlist.
@@ -203,11 +277,132 @@ class SpinConfig:
 
         return self.energy
 
+    def delta_energy(self, site, J=-2, u=1.1):
+        """Calculate the energy change of flipping the spin on a given site.
+
+        Only the external field on site and its two bonds to the nearest neighbors change,
+        so the cost is O(1) instead of the O(N) of a full hamiltonian() evaluation.
+
+        Parameters
+        ----------
+        site : integer
+            Index of the site to flip, in range [0, N_length).
+        J: float, optional
+            Coupling parameter, default J=-2 .
+        u: float, optional
+            External field strength, default u=1.1 .
+
+        Returns
+        -------
+        dE : float
+            hamiltonian() after the flip minus hamiltonian() before the flip.
+
+        Examples
+        --------
+        >>> myspin = SpinConfig(8)
+        >>> myspin.init_input_decimal(10)
+        [0, 0, 0, 0, 1, 0, 1, 0]
+        >>> myspin.delta_energy(0)
+        -5.8
+        """
+        spin, up_neighbors = self._local_state(site)
+
+        return _flip_energy(spin, up_neighbors, self.N_length, J, u)
+
+    def delta_energy_table(self, J=-2, u=1.1):
+        """Tabulate every energy change a single flip can produce.
+
+        In the 1-d chain dE depends only on the flipped spin and on how many of its two
+        nearest neighbors are up, so there are at most 6 distinct values for fixed (J, u).
+
+        Parameters
+        ----------
+        J: float, optional
+            Coupling parameter, default J=-2 .
+        u: float, optional
+            External field strength, default u=1.1 .
+
+        Returns
+        -------
+        dE_table : numpy.ndarray
+            Array of shape (2, 3), dE_table[spin, up_neighbors] is the energy change of flipping spin.
+
+        Examples
+        --------
+        >>> myspin = SpinConfig(8)
+        >>> myspin.delta_energy_table()
+        array([[ -5.8,   2.2,  10.2],
+               [  5.8,  -2.2, -10.2]])
+        """
+        dE_table = np.empty((2, 3))
+        for spin in range(2):
+            for up_neighbors in range(3):
+                dE_table[spin, up_neighbors] = _flip_energy(spin, up_neighbors, self.N_length, J, u)
+
+        return dE_table
+
+    def acceptance_table(self, T=10, J=-2, u=1.1):
+        """Tabulate the Metropolis acceptance probability min(1, exp(-dE/T)) of every possible flip.
+
+        Parameters
+        ----------
+        T : float, optional
+            Temperature
+        J: float, optional
+            Coupling parameter, default J=-2 .
+        u: float, optional
+            External field strength, default u=1.1 .
+
+        Returns
+        -------
+        self.acceptance : numpy.ndarray
+            Array of shape (2, 3), acceptance[spin, up_neighbors] is the probability to accept flipping spin.
+
+        Examples
+        --------
+        >>> myspin = SpinConfig(8)
+        >>> myspin.acceptance_table()
+        array([[1.        , 0.8025188 , 0.36059494],
+               [0.55989837, 1.        , 1.        ]])
+        """
+        self.acceptance = np.minimum(1.0, np.exp(-self.delta_energy_table(J, u) / T))
+
+        return self.acceptance
+
     # Observable
-    def observable_theory(self, T=10, J=-2, u=1.1):
+    def density_of_states(self, cache_dir=None):
+        """Joint density of states g[n_up, n_walls] of the 1-d Ising model with N_length.
+
+        Parameters
+        ----------
+        cache_dir : str, optional
+            Directory of the on-disk cache, default None keeps the cache in process only.
+
+        Returns
+        -------
+        self.g : numpy.ndarray
+            Read-only array of shape (N_length + 1, N_length + 1), number of spin configurations with
+            n_up up spins and n_walls domain walls.
+
+        Examples
+        --------
+        >>> myspin = SpinConfig(8)
+        >>> myspin.density_of_states().sum()
+        256.0
+        """
+        self.g = density_of_states(self.N_length, cache_dir)
+
+        return self.g
+
+    # Observable
+    def observable_theory(self, T=10, J=-2, u=1.1, cache_dir=None):
         """Calculate oberservables of 1-d Ising model with N_length theoretically
          under temperature T, wtih external field parameter u and coupling parameter J.
 
+        The sum over all iMax spin configurations runs over the cached density of states, which groups
+        them by number of up spins and domain walls; enumeration_observables sums over the configurations
+        one by one instead and serves as a reference.
+
         Parameters
         ----------
         T : float, optional
@@ -216,6 +411,8 @@ class SpinConfig:
             Coupling parameter, default J=-2 .
         u: float, optional
             External field strength, default u=1.1 .
+        cache_dir : str, optional
+            Directory of the on-disk density of states cache, default None .
 
         Returns
         -------
@@ -235,52 +432,239 @@ class SpinConfig:
         self.J = J
         self.u = u
 
-        # Sum up obserable of all possible spin configurations
-        Zsum = 0.0
-        E_theory = 0.0
-        EE_theory = 0.0
-        m_theory = 0.0
-        mm_theory = 0.0
-
-        for i_list in range(self.iMax):
-            self.spinlist = self.init_input_decimal(i_list)
-            self.magnetization()
-            self.hamiltonian(self.J, self.u)
-            Zi = np.exp(-self.energy / T)
-
-            Zsum += Zi
-            E_theory += Zi * self.energy
-            EE_theory += Zi * self.energy**2
-            m_theory += Zi * self.magnet
-            mm_theory += Zi * self.magnet**2
-
-        # Normalize over Zsum
-        self.E_theory = E_theory / Zsum
-        EE_theory = EE_theory / Zsum
-        self.m_theory = m_theory / Zsum
-        mm_theory = mm_theory / Zsum
-
-        # get capacity and magnetic susceptibility
-        self.C_theory = (EE_theory - self.E_theory**2) / (T * T)
-        self.ms_theory = (mm_theory - self.m_theory**2) / (T)
+        self.E_theory, self.m_theory, self.C_theory, self.ms_theory = density_of_states_observables(
+            self.density_of_states(cache_dir), T, self.J, self.u
+        )
+
+        return self.E_theory, self.m_theory, self.C_theory, self.ms_theory
+
+    def observable_theory_scan(self, T_list, J=-2, u=1.1, cache_dir=None):
+        """Calculate the oberservables of observable_theory for a whole array of temperatures.
+
+        The density of states g(n_up, n_walls) does not depend on T, so the Boltzmann weights of all
+        temperatures are evaluated over it in one broadcasted pass.
+
+        Parameters
+        ----------
+        T_list : numpy.ndarray
+            Temperatures
+        J: float, optional
+            Coupling parameter, default J=-2 .
+        u: float, optional
+            External field strength, default u=1.1 .
+        cache_dir : str, optional
+            Directory of the on-disk density of states cache, default None .
+
+        Returns
+        -------
+        E, m, C, ms : set of numpy.ndarray
+            Expectation of energy, average magnetism, heat capacibility, magnetic susceptbility for every T.
+
+        Examples
+        --------
+        >>> myspin = SpinConfig(8)
+        >>> E, m, C, ms = myspin.observable_theory_scan(np.linspace(0.1, 10, num=100))
+        >>> E[-1]
+        -3.6772068591549
+        """
+
+        self.J = J
+        self.u = u
+
+        return density_of_states_observables(self.density_of_states(cache_dir), T_list, self.J, self.u)
+
+    def observable_transfer_matrix(self, T=10, J=-2, u=1.1):
+        """Calculate the same exact oberservables as observable_theory with the 2x2 transfer matrix,
+         in a time independent of N_length.
+
+        Parameters
+        ----------
+        T : float, optional
+            Temperature
+        J: float, optional
+            Coupling parameter, default J=-2 .
+        u: float, optional
+            External field strength, default u=1.1 .
+
+        Returns
+        -------
+        E, m, C, ms : set
+            Expectation of energy, average magnetism, heat capacibility, magnetic susceptbility.
+
+        Examples
+        --------
+        >>> myspin = SpinConfig(8)
+        >>> myspin.observable_transfer_matrix()
+        (-3.6772068591549005, -0.5894627003462392, 0.3259341570934049, 0.5351140013397602)
+        """
+
+        self.J = J
+        self.u = u
+
+        self.E_theory, self.m_theory, self.C_theory, self.ms_theory = transfer_matrix_observables(
+            self.N_length, T, self.J, self.u
+        )
 
         return self.E_theory, self.m_theory, self.C_theory, self.ms_theory
 
-    def observable_metropolis_sampling(self, T=10, sample_size_M=10000, u=1.1, J=-2):
+    def metropolis_stream(self, T=10, u=1.1, J=-2, record="step", state=False, resume=False):
+        """Generate the metroplis samples of 1-d Monte Carlo under temperature T one record at a time.
+
+        The chain starts from init_rand_spinlist and never ends, so consumers stream, filter or stop
+        early (e.g. with itertools.islice) without holding the chain in memory. Every proposal is one
+        Markov step; self.energy and self.magnet follow the current state.
+        With resume=True the chain continues from the current spinlist, self.energy and self.magnet
+        instead, and the first record is that state again.
+
+        Parameters
+        ----------
+        T : float, optional
+            Temperature
+        u: float, optional
+            External field strength, default u=1.1
+        J: float, optional
+            Coupling parameter, default J=-2
+        record: str, optional
+            'step' yields after every proposal, 'sweep' after every N_length proposals, default 'step'
+        state: bool, optional
+            Also yield a copy of the spinlist, default False
+        resume: bool, optional
+            Continue from the current state, default False
+
+        Yields
+        ------
+        E, m : set
+            Energy and magnetization of the current state, followed by its spinlist if state is True.
+
+        Examples
+        --------
+        >>> import itertools
+        >>> myspin = SpinConfig(8)
+        >>> list(itertools.islice(myspin.metropolis_stream(), 3))
+        [(-8.0, 0), (-5.8, 2), (-5.8, 2)]
+        """
+        if record not in ("step", "sweep"):
+            raise ValueError(f"record({record}) should be 'step' or 'sweep'. ")
+        stride = self.N_length if record == "sweep" else 1
+
+        self.J = J
+        self.u = u
+
+        # a resumed chain continues the block of proposals it was drawing from, a new chain gives the unused
+        # proposals back before drawing its initial state, so consecutive runs do not depend on buffer_size
+        buffer = self.random_buffer
+        if buffer is None or buffer.rng is not self.rng:
+            buffer = self.random_buffer = RandomBuffer(self.rng, self.N_length, self.buffer_size)
+        elif not resume:
+            buffer.release()
+
+        # initalize the 1st sample, energy and magnetization are kept as running totals afterwards
+        if resume:
+            E_metro_sample = self.energy
+            m_metro_sample = self.magnet
+        else:
+            self.init_rand_spinlist()
+            E_metro_sample = self.energy = self.hamiltonian(self.J, self.u)
+            m_metro_sample = self.magnet = self.magnetization()
+
+        # dE and its acceptance only take a few discrete values, look them up instead of calling exp
+        dE_table = self.delta_energy_table(self.J, self.u).tolist()
+        acceptance = self.acceptance_table(T, self.J, self.u).tolist()
+
+        sites, uniforms = buffer.sites, buffer.uniforms
+        cursor = buffer.cursor
+        block_end = len(sites)
+
+        while True:
+            # checkpoints read the position in the block between two records
+            buffer.cursor = cursor
+            if state:
+                yield E_metro_sample, m_metro_sample, list(self.spinlist)
+            else:
+                yield E_metro_sample, m_metro_sample
+
+            # random flip one spin with decision:
+            for k in range(stride):
+                if cursor == block_end:
+                    sites, uniforms = buffer.refill()
+                    cursor = 0
+                    block_end = len(sites)
+                site = sites[cursor]
+                uniform = uniforms[cursor]
+                cursor += 1
+
+                spin, up_neighbors = self._local_state(site)
+                dE = dE_table[spin][up_neighbors]
+
+                # decision
+                if dE < 0 or uniform < acceptance[spin][up_neighbors]:
+                    self._flip(site)
+                    E_metro_sample += dE
+                    m_metro_sample += 2 - 4 * spin
+                    self.energy = E_metro_sample
+                    self.magnet = m_metro_sample
+
+    def observable_metropolis_sampling(
+        self,
+        T=10,
+        sample_size_M=10000,
+        u=1.1,
+        J=-2,
+        max_steps=None,
+        time_budget=None,
+        burn_in=0,
+        target_error=None,
+        checkpoint_path=None,
+        checkpoint_interval=60.0,
+    ):
         """
         Simulated averaged energy, magnetization, heat Capacity and magnetic susceptbility
          of 1-d Monte Carlo of sample_size_M under temperature T.
 
+        The averages are a reduction over metropolis_stream. Every proposal is one Markov step: a rejected
+        flip records the current state again, so the averages are unbiased and the run time is
+        proportional to sample_size_M at any temperature.
+        The run stops early after max_steps steps or time_budget seconds, whichever comes first. The
+        first self.burn_in samples are discarded as equilibration and the number of samples in the
+        averages is kept in self.steps; a run stopped before the end of its burn-in returns nan. The energy
+        and magnetization are accumulated with Welford's update in self.E_stats and self.m_stats
+        (RunningStats), which can be merged with the accumulators of other runs.
+
+        With burn_in='mser' or a target_error the E and m series are kept in memory, so sample_size_M also
+        bounds the memory. Then the burn-in is found by MSER on both series, the binning errors of the
+        averages are kept in self.E_error and self.m_error, and with a target_error the run is checked
+        at steps growing by 10% and stops as soon as both errors reach their targets.
+
+        With a checkpoint_path the run writes its state (spins, accumulators, step count, the state of the
+        random generator and the position in its proposal block) to that .npz file every
+        checkpoint_interval seconds, and appends the samples recorded since the last checkpoint to the
+        files checkpoint_path + '.E_series.bin' and '.m_series.bin'. If the .npz file already exists, the
+        run resumes from it and continues bit-for-bit like the uninterrupted run, so a preempted job is
+        restarted with the same call. A checkpoint of other T, u, J, sample_size_M, burn_in or target_error
+        raises ValueError; max_steps and time_budget may differ.
+
         Parameters
         ----------
         T : float, optional
             Temperature
         sample_size_M : int
-            sample size of the metroplis sample, default sample_size_M = 10000
+            sample size of the metroplis sample, including the burn-in, default sample_size_M = 10000
         u: float, optional
             External field strength, default u=1.1
         J: float, optional
             Coupling parameter, default J=-2
+        max_steps: int, optional
+            Upper bound of Metropolis steps, default None .
+        time_budget: float, optional
+            Upper bound of wall-clock seconds, default None .
+        burn_in: int or str, optional
+            Number of initial samples to discard, or 'mser' to detect the equilibration, default 0 .
+        target_error: float or set, optional
+            Standard error of E and m, or of (E, m), at which the run stops, default None .
+        checkpoint_path: str, optional
+            File to checkpoint to and resume from, default None .
+        checkpoint_interval: float, optional
+            Wall-clock seconds between two checkpoints, default checkpoint_interval = 60.0
 
         Returns
         -------
@@ -291,56 +675,340 @@ class SpinConfig:
         --------
         >>> myspin = SpinConfig(8)
         >>> mySpin.observable_metropolis_sampling()
-        (-1.2713199999999993, -0.2052, 0.36647321457601023, 0.6763492959999999)
+        (-3.6934, -0.5904, 0.3236, 0.5339)
+        >>> mySpin.observable_metropolis_sampling(sample_size_M=10**6, burn_in="mser", target_error=0.02)
+        (-3.6863, -0.5929, 0.3264, 0.5363)
+        >>> mySpin.burn_in, mySpin.steps
+        (0, 549831)
         """
 
         self.J = J
         self.u = u
 
-        # initalize the 1st sample
-        self.init_rand_spinlist()
+        # everything a checkpoint must share with the call that resumes it, max_steps and time_budget only
+        # stop the run early
+        run_parameters = dict(T=float(T), u=float(u), J=float(J), sample_size_M=int(sample_size_M))
+        if max_steps is not None:
+            sample_size_M = min(sample_size_M, max_steps)
+        if time_budget is not None:
+            deadline = time.perf_counter() + time_budget
+        if burn_in != "mser" and not 0 <= burn_in < sample_size_M:
+            raise ValueError(f"burn_in({burn_in}) should be 'mser' or between 0 and sample_size_M({sample_size_M}). ")
+
+        record = burn_in == "mser" or target_error is not None
+        run_parameters.update(
+            burn_in=burn_in if burn_in == "mser" else int(burn_in),
+            target_error=None if target_error is None else np.ravel(target_error).astype(float).tolist(),
+            record=record,
+        )
+        if record:
+            E_series = np.empty(sample_size_M)
+            m_series = np.empty(sample_size_M)
+        if target_error is not None:
+            target_error = np.broadcast_to(np.asarray(target_error, dtype=float), (2,))
+            next_check = 1024
+        else:
+            next_check = 0
+
+        self.E_stats = RunningStats()
+        self.m_stats = RunningStats()
+        j = 0
+
+        resume = checkpoint_path is not None and os.path.exists(checkpoint_path)
+        if resume:
+            j, next_check, recorded_series = self._load_checkpoint(checkpoint_path, run_parameters)
+            if record:
+                E_series[:j], m_series[:j] = recorded_series
+        # samples of the recorded series that are already in the checkpoint files
+        series_saved = j
+        if checkpoint_path is not None:
+            next_checkpoint = time.perf_counter() + checkpoint_interval
+
+        # reduce the stream of metroplis samples, the first one is the random initial state
+        stream = self.metropolis_stream(T, u, J, resume=resume)
+        if resume:
+            # the current state was already recorded before the checkpoint
+            next(stream)
+        for E_metro_sample, m_metro_sample in stream:
+            if record:
+                E_series[j] = E_metro_sample
+                m_series[j] = m_metro_sample
+            elif j >= burn_in:
+                self.E_stats.add(E_metro_sample)
+                self.m_stats.add(m_metro_sample)
+            j += 1
+
+            if j >= sample_size_M:
+                break
+            # reading the clock every step would cost more than the step itself
+            if (time_budget is not None or checkpoint_path is not None) and j % 1024 == 0:
+                now = time.perf_counter()
+                if time_budget is not None and now > deadline:
+                    break
+                if checkpoint_path is not None and now >= next_checkpoint:
+                    new_series = (E_series[series_saved:j], m_series[series_saved:j]) if record else None
+                    self._save_checkpoint(checkpoint_path, run_parameters, j, next_check, new_series, series_saved)
+                    series_saved = j
+                    next_checkpoint = now + checkpoint_interval
+            if target_error is not None and j >= next_check:
+                # checking at geometrically growing steps keeps the cost of the analysis linear in j
+                next_check = int(1.1 * j)
+                errors = self._series_errors(E_series[:j], m_series[:j], burn_in)[1:]
+                if np.all(np.asarray(errors) <= target_error):
+                    break
+        stream.close()
+
+        if record:
+            self.burn_in, self.E_error, self.m_error = self._series_errors(E_series[:j], m_series[:j], burn_in)
+            self.burn_in = min(self.burn_in, j)
+            self.E_stats.add_batch(E_series[self.burn_in:j])
+            self.m_stats.add_batch(m_series[self.burn_in:j])
+        else:
+            self.burn_in = min(burn_in, j)
+        self.steps = j - self.burn_in
+
+        # average to get the simulated observables, a run stopped within its burn-in has nothing to average
+        if self.steps == 0:
+            self.E_metropolis = self.m_metropolis = self.C_metropolis = self.ms_metropolis = float("nan")
+        else:
+            self.E_metropolis = float(self.E_stats.mean)
+            self.m_metropolis = float(self.m_stats.mean)
+            self.C_metropolis = float(self.E_stats.variance / (T * T))
+            self.ms_metropolis = float(self.m_stats.variance / (T))
+
+        return (
+            self.E_metropolis,
+            self.m_metropolis,
+            self.C_metropolis,
+            self.ms_metropolis,
+        )
+
+    @staticmethod
+    def _series_paths(path):
+        """Files next to the checkpoint path that hold the recorded E and m series."""
+        return f"{path}.E_series.bin", f"{path}.m_series.bin"
+
+    def _save_checkpoint(self, path, run_parameters, j, next_check, new_series=None, series_saved=0):
+        """Write the state of a metropolis run with the run_parameters dict after j samples to the .npz file path.
+
+        The recorded series are appended to their own files, so a checkpoint only writes new_series, the
+        samples after the first series_saved, instead of the whole prefix; the .npz file is replaced
+        last and records how many samples of those files are valid.
+        """
+        arrays = dict(
+            parameters=np.array(json.dumps(run_parameters)),
+            steps=np.array([j, next_check, self.magnet]),
+            energy=self.energy,
+            spins=np.packbits(np.array(self.spinlist, dtype=np.uint8)),
+            stats=np.array([[stats.count, stats.mean, stats.M2] for stats in (self.E_stats, self.m_stats)]),
+            rng_state=_rng_state_text(self.rng),
+            buffer_state=self.random_buffer.get_state(),
+        )
+        if new_series is not None:
+            for series_path, series in zip(self._series_paths(path), new_series):
+                with open(series_path, "ab") as handle:
+                    # drop samples beyond the last checkpoint, e.g. of a run preempted while appending
+                    handle.truncate(series_saved * 8)
+                    handle.write(np.asarray(series, dtype="<f8").tobytes())
+            arrays["series_length"] = j
+
+        with _atomic_open(path) as handle:
+            np.savez(handle, **arrays)
+
+    def _load_checkpoint(self, path, run_parameters):
+        """Restore the state of a metropolis run from path, returning j, next_check and the recorded series."""
+        with np.load(path) as checkpoint:
+            saved_parameters = json.loads(str(checkpoint["parameters"]))
+            if saved_parameters != run_parameters:
+                raise ValueError(f"checkpoint {path} of {saved_parameters} cannot resume {run_parameters}. ")
+
+            j, next_check, self.magnet = (int(value) for value in checkpoint["steps"])
+            self.energy = float(checkpoint["energy"])
+            self.spinlist = np.unpackbits(checkpoint["spins"], count=self.N_length).tolist()
+            for stats, (count, mean, M2) in zip((self.E_stats, self.m_stats), checkpoint["stats"].tolist()):
+                stats.count, stats.mean, stats.M2 = count, mean, M2
+
+            self.rng = _rng_from_state_text(checkpoint["rng_state"])
+            self.random_buffer = RandomBuffer(self.rng, self.N_length, self.buffer_size)
+            self.random_buffer.set_state(checkpoint["buffer_state"])
+
+            recorded_series = None
+            if "series_length" in checkpoint:
+                series_length = int(checkpoint["series_length"])
+                recorded_series = tuple(
+                    np.fromfile(series_path, dtype="<f8", count=series_length)
+                    for series_path in self._series_paths(path)
+                )
+                if any(len(series) < series_length for series in recorded_series):
+                    raise ValueError(f"series files of checkpoint {path} hold fewer than {series_length} samples. ")
+
+        return j, next_check, recorded_series
+
+    @staticmethod
+    def _series_errors(E_series, m_series, burn_in):
+        """Burn-in and binning standard errors of E and m, inf while too few samples remain."""
+        if burn_in == "mser":
+            burn_in = max(mser_burn_in(E_series), mser_burn_in(m_series))
+
+        if len(E_series) - burn_in < 64:
+            return burn_in, np.inf, np.inf
+
+        E_error = binning_errors(E_series[burn_in:])[1][-1]
+        m_error = binning_errors(m_series[burn_in:])[1][-1]
+        return burn_in, float(E_error), float(m_error)
+
+    def observable_cluster_sampling(self, T=10, sample_size_M=10000, u=1.1, J=-2, algorithm="wolff"):
+        """
+        Simulated averaged energy, magnetization, heat Capacity and magnetic susceptbility
+         of 1-d Monte Carlo of sample_size_M cluster moves under temperature T.
+
+        Parameters
+        ----------
+        T : float, optional
+            Temperature
+        sample_size_M : int
+            sample size of the cluster sample, default sample_size_M = 10000
+        u: float, optional
+            External field strength, default u=1.1
+        J: float, optional
+            Coupling parameter, default J=-2
+        algorithm: str, optional
+            'wolff' flips one cluster per move with a field correction, 'swendsen_wang' flips all clusters
+            of the chain with a ghost spin for the field, default algorithm = 'wolff'
+
+        Returns
+        -------
+        E, m, C, ms : set
+            Average energy, average magnetism, heat capacibility, magnetic susceptbility.
+
+        Examples
+        --------
+        >>> myspin = SpinConfig(8)
+        >>> myspin.observable_cluster_sampling(algorithm="swendsen_wang")
+        (-3.6732, -0.5898, 0.3274, 0.5349)
+        """
+        if algorithm == "wolff":
+            cluster_update = wolff_update
+        elif algorithm == "swendsen_wang":
+            cluster_update = swendsen_wang_update
+        else:
+            raise ValueError(f"algorithm({algorithm}) should be 'wolff' or 'swendsen_wang'. ")
 
-        spin_metro_sample = self.spinlist
-        E_metro_sample = self.hamiltonian()
+        self.J = J
+        self.u = u
+
+        # initalize the 1st sample, the cluster moves act on an int8 copy of the spinlist
+        spins = np.array(self.init_rand_spinlist(), dtype=np.int8)
+        E_metro_sample = self.hamiltonian(self.J, self.u)
         m_metro_sample = self.magnetization()
 
-        E_metro_sum = E_metro_sample
-        m_metro_sum = m_metro_sample
-        EE_metro_sum = E_metro_sample**2
-        mm_metro_sum = m_metro_sample**2
-
-        # generate the rest M-1 metroplis samples by random flip one spin with decision:
-        j = 1
-        while j < sample_size_M:
-            self.random_flip()
-            dE = self.hamiltonian() - E_metro_sample
-
-            # decision
-            if dE < 0 or np.random.random() < np.exp(-dE / T):
-                j += 1
-                spin_metro_sample = self.spinlist
-                E_metro_sample = self.energy
-                self.magnetization()
-                m_metro_sample = self.magnet
-
-                E_metro_sum += E_metro_sample
-                EE_metro_sum += E_metro_sample**2
-                m_metro_sum += m_metro_sample
-                mm_metro_sum += m_metro_sample**2
+        self.E_stats = RunningStats()
+        self.m_stats = RunningStats()
+        self.E_stats.add(E_metro_sample)
+        self.m_stats.add(m_metro_sample)
 
-            else:
-                self.spinlist = spin_metro_sample
+        # every move counts as a sample, also when a Wolff flip is rejected
+        for j in range(1, sample_size_M):
+            dE, dm = cluster_update(spins, T, self.J, self.u, self.rng)
+            E_metro_sample += dE
+            m_metro_sample += dm
+
+            self.E_stats.add(E_metro_sample)
+            self.m_stats.add(m_metro_sample)
+
+        self.spinlist = spins.tolist()
+        self.energy = E_metro_sample
+        self.magnet = m_metro_sample
 
         # average to get the simulated observables
-        self.E_metropolis = E_metro_sum / sample_size_M
-        self.m_metropolis = m_metro_sum / sample_size_M
-        self.C_metropolis = (EE_metro_sum / sample_size_M - self.E_metropolis**2) / (
-            T * T
-        )
-        self.ms_metropolis = (mm_metro_sum / sample_size_M - self.m_metropolis**2) / (
-            T
+        self.E_metropolis = self.E_stats.mean
+        self.m_metropolis = self.m_stats.mean
+        self.C_metropolis = self.E_stats.variance / (T * T)
+        self.ms_metropolis = self.m_stats.variance / (T)
+
+        return (
+            self.E_metropolis,
+            self.m_metropolis,
+            self.C_metropolis,
+            self.ms_metropolis,
         )
 
+    def observable_nfold_sampling(self, T=10, sample_size_M=10000, u=1.1, J=-2):
+        """
+        Simulated averaged energy, magnetization, heat Capacity and magnetic susceptbility
+         of 1-d rejection-free n-fold way (BKL) Monte Carlo of sample_size_M flips under temperature T.
+
+        Sites are grouped into classes of equal dE, and every event flips a site drawn with probability
+        proportional to its Metropolis rate. Each visited state is weighted by its expected residence
+        time N_length / R, measured in Metropolis steps, where R is the total flip rate, so the averages
+        are comparable to a Metropolis run that counts every proposal.
+
+        Parameters
+        ----------
+        T : float, optional
+            Temperature
+        sample_size_M : int
+            Number of flips, default sample_size_M = 10000
+        u: float, optional
+            External field strength, default u=1.1
+        J: float, optional
+            Coupling parameter, default J=-2
+
+        Returns
+        -------
+        E, m, C, ms : set
+            Time weighted average energy, average magnetism, heat capacibility, magnetic susceptbility.
+
+        Examples
+        --------
+        >>> myspin = SpinConfig(8)
+        >>> myspin.observable_nfold_sampling()
+        (-3.6803, -0.5911, 0.3251, 0.5338)
+        """
+
+        self.J = J
+        self.u = u
+
+        dE_table = self.delta_energy_table(self.J, self.u).ravel().tolist()
+        rates = self.acceptance_table(T, self.J, self.u).ravel().tolist()
+
+        spins = list(self.init_rand_spinlist())
+        E_metro_sample = self.hamiltonian(self.J, self.u)
+        m_metro_sample = self.magnetization()
+        classes = SiteClasses(spins, self.rng)
+
+        self.E_stats = RunningStats()
+        self.m_stats = RunningStats()
+
+        for j in range(sample_size_M):
+            site, total_rate = classes.select(rates)
+            if site is None:
+                # no flip is possible, the current state absorbs all remaining time
+                self.E_stats = RunningStats()
+                self.m_stats = RunningStats()
+                self.E_stats.add(E_metro_sample)
+                self.m_stats.add(m_metro_sample)
+                break
+
+            weight = self.N_length / total_rate
+            self.E_stats.add(E_metro_sample, weight)
+            self.m_stats.add(m_metro_sample, weight)
+
+            c = classes.site_class[site]
+            E_metro_sample += dE_table[c]
+            m_metro_sample += 2 - 4 * spins[site]
+            classes.flip(site)
+
+        self.spinlist = spins
+        self.energy = E_metro_sample
+        self.magnet = m_metro_sample
+
+        # average to get the simulated observables
+        self.E_metropolis = self.E_stats.mean
+        self.m_metropolis = self.m_stats.mean
+        self.C_metropolis = self.E_stats.variance / (T * T)
+        self.ms_metropolis = self.m_stats.variance / (T)
+
         return (
             self.E_metropolis,
             self.m_metropolis,
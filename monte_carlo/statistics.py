@@ -0,0 +1,102 @@
+"""
+RunningStats class, streaming and mergeable mean and variance of observables
+"""
+
+import numpy as np
+
+
+class RunningStats:
+    def __init__(self):
+        """Accumulate the weighted mean and variance of a stream of samples with Welford's update.
+
+        The variance is kept as M2, the sum of weighted squared deviations from the running mean, which
+        avoids the cancellation of <x**2> - <x>**2 on long runs. Two accumulators are merged with
+        Chan's formula, so batches, chains and worker processes combine without revisiting samples.
+        Samples can be scalars or numpy arrays (e.g. one entry per chain).
+
+        Returns
+        -------
+        RunningStats : class
+            An empty accumulator.
+
+        Examples
+        --------
+        >>> stats = RunningStats()
+        >>> for x in [1.0, 2.0, 4.0]:
+        ...     stats.add(x)
+        >>> stats.mean, stats.variance
+        (2.3333333333333335, 1.5555555555555556)
+        """
+        self.count = 0.0
+        self.mean = 0.0
+        self.M2 = 0.0
+
+    def add(self, x, weight=1.0):
+        """Add one sample with an optional weight.
+
+        Parameters
+        ----------
+        x : float or numpy.ndarray
+            Sample.
+        weight : float, optional
+            Statistical weight of the sample, default weight = 1.0
+        """
+        self.count += weight
+        delta = x - self.mean
+        self.mean = self.mean + delta * (weight / self.count)
+        self.M2 = self.M2 + weight * delta * (x - self.mean)
+
+    def add_batch(self, x, weights=None, axis=0):
+        """Add all samples of an array along axis, reduced in one NumPy pass and merged in.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            Samples.
+        weights : numpy.ndarray, optional
+            Statistical weights broadcastable against x, default None weighs every sample 1.
+        axis : int, optional
+            Axis of x that enumerates the samples, default axis = 0
+        """
+        x = np.asarray(x, dtype=float)
+        if weights is None:
+            weights = np.ones_like(x)
+        x, weights = np.broadcast_arrays(x, np.asarray(weights, dtype=float))
+
+        batch = RunningStats()
+        batch.count = weights.sum(axis=axis)
+        # an empty batch has no mean, merge skips it
+        with np.errstate(invalid="ignore", divide="ignore"):
+            batch.mean = (weights * x).sum(axis=axis) / batch.count
+        batch.M2 = (weights * (x - np.expand_dims(batch.mean, axis)) ** 2).sum(axis=axis)
+        self.merge(batch)
+
+    def merge(self, other):
+        """Merge the samples of another accumulator into this one (Chan et al.).
+
+        Parameters
+        ----------
+        other : RunningStats
+            Accumulator of a disjoint set of samples.
+
+        Returns
+        -------
+        self : RunningStats
+            This accumulator, now covering both sets of samples.
+        """
+        if np.all(other.count == 0):
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / count)
+        self.M2 = self.M2 + other.M2 + delta**2 * (self.count * other.count / count)
+        self.count = count
+
+        return self
+
+    @property
+    def variance(self):
+        """Weighted population variance of the samples, M2 / count, nan without samples."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.divide(self.M2, self.count)
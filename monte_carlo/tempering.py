@@ -0,0 +1,173 @@
+"""
+ParallelTempering class, replica exchange Monte Carlo of the 1-d Ising model on a temperature ladder
+"""
+
+import numpy as np
+
+from .ensemble import SpinEnsemble
+from .rng import make_rng
+from .spinconfig import SpinConfig
+from .statistics import RunningStats
+
+
+class ParallelTempering:
+    def __init__(self, N_length=10, T_list=(0.5, 1.0, 2.0, 4.0), rng=None):
+        """Create one replica of the 1-d Ising model with N_length per temperature of the ladder T_list.
+
+        The replicas are the rows of a SpinEnsemble and advance together with its checkerboard sweep,
+        each row with the acceptance table of its own temperature. Exchanges swap the configurations of
+        neighboring temperatures, so row i always samples at T_list[i].
+
+        Parameters
+        ----------
+        N_length: integer , optional
+            Length of every replica.
+        T_list: list of float , optional
+            Temperature ladder, sorted in increasing order.
+        rng: int, numpy.random.SeedSequence or numpy.random.Generator, optional
+            Seed or generator of the random numbers of the sweeps and the exchanges, see make_rng,
+            default None draws fresh entropy.
+
+        Returns
+        -------
+        ParallelTempering : class
+            A ladder of len(T_list) replicas.
+
+        Examples
+        --------
+        >>> mytempering = ParallelTempering(8, [0.5, 1.0, 2.0, 4.0])
+        >>> mytempering.replicas.spins.shape
+        (4, 8)
+        """
+        self.N_length = N_length
+        self.T_list = np.sort(np.asarray(T_list, dtype=float))
+        self.rng = make_rng(rng)
+        self.replicas = SpinEnsemble(self.N_length, len(self.T_list), self.rng)
+
+    def _exchange(self, parity):
+        """Propose swaps between the neighboring temperatures (i, i+1) with i of the given parity."""
+        lower = np.arange(parity, len(self.T_list) - 1, 2)
+        upper = lower + 1
+        beta = 1.0 / self.T_list
+
+        # min(1, exp((beta_i - beta_j) * (E_i - E_j)))
+        log_acceptance = (beta[lower] - beta[upper]) * (self.energy[lower] - self.energy[upper])
+        accepted = self.rng.random(len(lower)) < np.exp(np.minimum(0.0, log_acceptance))
+
+        self.swap_attempts[lower] += 1
+        self.swap_accepts[lower] += accepted
+
+        lower, upper = lower[accepted], upper[accepted]
+        for values in (self.replicas.spins, self.energy, self.magnet):
+            values[lower], values[upper] = values[upper], values[lower]
+
+    # Observable
+    def observable_tempering_sampling(self, sweeps=1000, u=1.1, J=-2, exchange_interval=1):
+        """
+        Simulated averaged energy, magnetization, heat Capacity and magnetic susceptbility
+         at every temperature of the ladder with replica exchange.
+
+        Parameters
+        ----------
+        sweeps : int
+            Number of checkerboard sweeps of every replica, default sweeps = 1000
+        u: float, optional
+            External field strength, default u=1.1
+        J: float, optional
+            Coupling parameter, default J=-2
+        exchange_interval: int, optional
+            Number of sweeps between two rounds of swap proposals, default exchange_interval = 1
+
+        Returns
+        -------
+        E, m, C, ms : set of numpy.ndarray
+            Average energy, average magnetism, heat capacibility, magnetic susceptbility at every T.
+            The swap acceptance rate of every pair of neighboring temperatures is kept in
+            self.swap_acceptance.
+
+        Examples
+        --------
+        >>> mytempering = ParallelTempering(8, [0.5, 1.0, 2.0, 4.0])
+        >>> E, m, C, ms = mytempering.observable_tempering_sampling()
+        >>> mytempering.swap_acceptance
+        array([0.9707, 0.5935, 0.4404])
+        """
+
+        self.J = J
+        self.u = u
+
+        spin_config = SpinConfig(self.N_length)
+        dE_table = spin_config.delta_energy_table(self.J, self.u)
+        flip_probability = np.array([spin_config.acceptance_table(T, self.J, self.u) for T in self.T_list])
+
+        self.replicas.init_rand_spins()
+        self.energy = self.replicas.hamiltonian(self.J, self.u)
+        self.magnet = self.replicas.magnetization()
+        self.swap_attempts = np.zeros(len(self.T_list) - 1, dtype=np.int64)
+        self.swap_accepts = np.zeros(len(self.T_list) - 1, dtype=np.int64)
+
+        self.E_stats = RunningStats()
+        self.m_stats = RunningStats()
+
+        for sweep in range(sweeps):
+            dE, dm = self.replicas._sweep(dE_table, flip_probability)
+            self.energy += dE
+            self.magnet += dm
+
+            if (sweep + 1) % exchange_interval == 0:
+                # alternate between the even and the odd pairs of the ladder
+                self._exchange((sweep // exchange_interval) % 2)
+
+            self.E_stats.add(self.energy)
+            self.m_stats.add(self.magnet)
+
+        self.swap_acceptance = self.swap_accepts / np.maximum(self.swap_attempts, 1)
+
+        # average to get the simulated observables at every temperature
+        self.E_metropolis = self.E_stats.mean
+        self.m_metropolis = self.m_stats.mean
+        self.C_metropolis = self.E_stats.variance / (self.T_list * self.T_list)
+        self.ms_metropolis = self.m_stats.variance / (self.T_list)
+
+        return (
+            self.E_metropolis,
+            self.m_metropolis,
+            self.C_metropolis,
+            self.ms_metropolis,
+        )
+
+    def tune_ladder(self, sweeps=200, rounds=10, u=1.1, J=-2):
+        """Adapt the inner temperatures of the ladder so that all swap acceptance rates become equal.
+
+        Every round samples the current ladder, then widens the gaps (in log T) of pairs that swap more
+        often than average and narrows the others. The lowest and highest temperatures stay fixed.
+
+        Parameters
+        ----------
+        sweeps : int, optional
+            Number of sweeps per tuning round, default sweeps = 200
+        rounds : int, optional
+            Number of tuning rounds, default rounds = 10
+        u: float, optional
+            External field strength, default u=1.1
+        J: float, optional
+            Coupling parameter, default J=-2
+
+        Returns
+        -------
+        self.T_list : numpy.ndarray
+            The tuned temperature ladder.
+        """
+        log_T = np.log(self.T_list)
+        for tuning_round in range(rounds):
+            self.observable_tempering_sampling(sweeps, u, J)
+
+            # damped multiplicative update, the offset keeps pairs that never swap from collapsing
+            rate = self.swap_acceptance + 0.01
+            gaps = np.diff(log_T) * np.sqrt(rate / rate.mean())
+            gaps *= (log_T[-1] - log_T[0]) / gaps.sum()
+            log_T = np.concatenate([[log_T[0]], log_T[0] + np.cumsum(gaps)])
+            log_T[-1] = np.log(self.T_list[-1])
+            self.T_list = np.exp(log_T)
+
+        return self.T_list
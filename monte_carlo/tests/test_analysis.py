@@ -0,0 +1,96 @@
+"""
+Unit and regression test for the time series analysis.
+"""
+
+import numpy as np
+import pytest
+
+import monte_carlo
+
+
+@pytest.fixture(scope="module")
+def ar1_series():
+    # AR(1) process x_t = phi * x_{t-1} + noise has tau = (1 + phi) / (1 - phi)
+    rng = np.random.default_rng(0)
+    phi = 0.8
+    noise = rng.normal(size=200000)
+    x = np.empty_like(noise)
+    x[0] = noise[0]
+    for t in range(1, len(x)):
+        x[t] = phi * x[t - 1] + noise[t]
+    return x, (1 + phi) / (1 - phi)
+
+
+def test_autocorrelation_function():
+    rho = monte_carlo.autocorrelation_function([1.0, -1.0, 1.0, -1.0], max_lag=2)
+    assert np.allclose(rho, [1.0, -0.75, 0.5])
+
+    # chunk borders do not lose lag pairs
+    x = np.random.default_rng(1).normal(size=1000)
+    assert np.allclose(
+        monte_carlo.autocorrelation_function(x, max_lag=50, chunk_size=64),
+        monte_carlo.autocorrelation_function(x, max_lag=50),
+    )
+
+    assert np.allclose(monte_carlo.autocorrelation_function(np.ones(10)), np.eye(1, 10)[0])
+
+
+def test_integrated_autocorrelation_time(ar1_series):
+    x, tau = ar1_series
+    assert monte_carlo.integrated_autocorrelation_time(x) == pytest.approx(tau, rel=0.1)
+    assert monte_carlo.integrated_autocorrelation_time(x, max_lag=200, chunk_size=4096) == pytest.approx(
+        monte_carlo.integrated_autocorrelation_time(x)
+    )
+    assert monte_carlo.effective_sample_size(x) == pytest.approx(len(x) / tau, rel=0.1)
+
+
+def test_binning_errors(ar1_series):
+    x, tau = ar1_series
+    block_sizes, errors = monte_carlo.binning_errors(x)
+    assert block_sizes[0] == 1
+    assert len(x) // block_sizes[-1] >= 32
+    # the plateau is the standard error of a series with len(x) / tau independent samples
+    assert errors[-1] == pytest.approx(np.sqrt(x.var() * tau / len(x)), rel=0.3)
+
+    chunked_block_sizes, chunked_errors = monte_carlo.binning_errors(x, chunk_size=1000)
+    assert np.array_equal(block_sizes, chunked_block_sizes)
+    assert np.allclose(errors, chunked_errors)
+
+    with pytest.raises(ValueError):
+        monte_carlo.binning_errors(np.zeros(10))
+
+
+def test_time_series_analysis(ar1_series):
+    x, tau = ar1_series
+    mean, error, tau_estimate, ess = monte_carlo.time_series_analysis(x)
+    assert mean == pytest.approx(x.mean())
+    assert abs(mean) < 5 * error
+    assert ess == pytest.approx(len(x) / tau_estimate)
+
+
+def test_mser_burn_in():
+    transient = np.linspace(10.0, 0.0, 50)
+    assert monte_carlo.mser_burn_in(np.concatenate([transient, np.tile([1.0, -1.0], 500)])) == 50
+    assert monte_carlo.mser_burn_in(np.zeros(100)) == 0
+    assert monte_carlo.mser_burn_in(np.zeros(3)) == 0
+
+
+def test_mser_burn_in_chunked(tmp_path):
+    # a relaxation followed by a correlated tail, partly frozen in one state
+    rng = np.random.default_rng(5)
+    x = 20 * np.exp(-np.arange(20000) / 300) + np.convolve(rng.normal(size=20000), np.ones(10), "same")
+    x[15000:] = 1.0
+    memmap = np.memmap(tmp_path / "series.bin", dtype=float, mode="w+", shape=x.shape)
+    memmap[:] = x
+
+    expected = monte_carlo.mser_burn_in(x)
+    assert 0 < expected < 10000
+    for chunk_size in [7, 1000, 2**20]:
+        assert monte_carlo.mser_burn_in(memmap, chunk_size=chunk_size) == expected
+
+
+def test_geweke_z_score():
+    x = np.random.default_rng(2).normal(size=5000)
+    assert abs(monte_carlo.geweke_z_score(x)) < 4
+    x[:500] += 3
+    assert monte_carlo.geweke_z_score(x) > 10
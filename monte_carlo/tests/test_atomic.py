@@ -0,0 +1,22 @@
+"""
+Unit and regression test for the atomic file replacement.
+"""
+
+import pytest
+
+from monte_carlo._atomic import _atomic_open
+
+
+def test_atomic_open(tmp_path):
+    path = tmp_path / "data.txt"
+    with _atomic_open(path, "w") as handle:
+        handle.write("first")
+    assert path.read_text() == "first"
+
+    # a failed write keeps the old file and leaves no temporary file behind
+    with pytest.raises(RuntimeError):
+        with _atomic_open(path, "w") as handle:
+            handle.write("partial")
+            raise RuntimeError("preempted")
+    assert path.read_text() == "first"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["data.txt"]
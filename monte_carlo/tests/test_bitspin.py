@@ -0,0 +1,117 @@
+"""
+Unit and regression test for the bit-packed spin configuration.
+"""
+
+# Import package, test suite, and other packages as needed
+import pytest
+import monte_carlo
+
+
+def test_bitspinconfig():
+    test_spin = monte_carlo.BitSpinConfig(8)
+
+    # initialization
+    expected_init_input_decimal = [0, 0, 0, 0, 1, 0, 1, 0]
+    calculated_init_input_decimal = test_spin.init_input_decimal(10)
+
+    # property
+    expected_magnetization = -4
+    calculated_magnetization = test_spin.magnetization()
+
+    expected_hamiltonian = -4.4
+    calculated_hamiltonian = test_spin.hamiltonian()
+
+    expected_domain_walls = 4
+    calculated_domain_walls = test_spin.domain_walls()
+
+    assert expected_init_input_decimal == calculated_init_input_decimal
+    assert test_spin.state == 10
+    assert expected_magnetization == calculated_magnetization
+    assert expected_hamiltonian == pytest.approx(calculated_hamiltonian)
+    assert expected_domain_walls == calculated_domain_walls
+
+    with pytest.raises(ValueError):
+        test_spin.init_input_decimal(256)
+
+
+@pytest.mark.parametrize("N_length", [1, 2, 3, 7])
+def test_bitspinconfig_matches_spinconfig(N_length):
+    bit_spin = monte_carlo.BitSpinConfig(N_length)
+    list_spin = monte_carlo.SpinConfig(N_length)
+
+    for decimal_input in range(2**N_length):
+        assert bit_spin.init_input_decimal(decimal_input) == list_spin.init_input_decimal(decimal_input)
+        assert bit_spin.magnetization() == list_spin.magnetization()
+        assert bit_spin.hamiltonian(J=1.5, u=-0.3) == pytest.approx(list_spin.hamiltonian(J=1.5, u=-0.3))
+
+        for site in range(N_length):
+            assert bit_spin._local_state(site) == list_spin._local_state(site)
+            assert bit_spin.delta_energy(site) == pytest.approx(list_spin.delta_energy(site))
+            assert bit_spin.flip(site) == list_spin.flip(site)
+            bit_spin.flip(site)
+            list_spin.flip(site)
+
+    # assigning a list re-encodes the state
+    bit_spin.spinlist = [1] * N_length
+    assert bit_spin.state == 2**N_length - 1
+
+
+def test_bitspinconfig_sampling():
+    # both backends consume the random stream identically, whatever the block size of their proposals
+    bit_spin = monte_carlo.BitSpinConfig(8, rng=1, buffer_size=1000)
+    list_spin = monte_carlo.SpinConfig(8, rng=1)
+
+    expected_observables = list_spin.observable_metropolis_sampling(sample_size_M=2000)
+    calculated_observables = bit_spin.observable_metropolis_sampling(sample_size_M=2000)
+
+    assert calculated_observables == pytest.approx(expected_observables)
+    assert bit_spin.observable_theory() == pytest.approx(list_spin.observable_theory())
+
+
+def test_bitspinconfig_long_chain():
+    # flips touch one byte of the packed store, the spinlist view follows every change
+    N_length = 1000
+    bit_spin = monte_carlo.BitSpinConfig(N_length, rng=2)
+    list_spin = monte_carlo.SpinConfig(N_length)
+    list_spin.spinlist = list(bit_spin.init_rand_spinlist())
+    assert len(bit_spin.bits) == 125
+
+    for site in [0, 7, 8, 500, 998, 999]:
+        assert bit_spin._local_state(site) == list_spin._local_state(site)
+        view = bit_spin.spinlist
+        assert bit_spin.spinlist is view
+        assert bit_spin.flip(site) == list_spin.flip(site)
+        assert bit_spin.spinlist is not view
+
+    assert bit_spin.magnetization() == list_spin.magnetization()
+    assert bit_spin.hamiltonian() == pytest.approx(list_spin.hamiltonian())
+    assert bit_spin.state == int("".join(str(spin) for spin in list_spin.spinlist), 2)
+
+
+def test_bitspinconfig_spinlist_view_writes_back():
+    test_spin = monte_carlo.BitSpinConfig(4)
+    test_spin.init_input_decimal(0)
+
+    # item and slice assignments to the view update the bits
+    test_spin.spinlist[0] = 1
+    assert test_spin.spinlist == [1, 0, 0, 0]
+    assert test_spin.state == 8
+    assert test_spin.magnetization() == -2
+
+    test_spin.spinlist[-1] = 1
+    test_spin.spinlist[1:3] = [1, 1]
+    assert test_spin.state == 15
+
+    with pytest.raises(ValueError):
+        test_spin.spinlist[0] = 2
+    assert test_spin.spinlist == [1, 1, 1, 1]
+
+    # the chain length is fixed
+    with pytest.raises(TypeError):
+        test_spin.spinlist.append(0)
+    with pytest.raises(TypeError):
+        del test_spin.spinlist[0]
+    with pytest.raises(ValueError):
+        test_spin.spinlist[1:3] = [0]
+    assert test_spin.spinlist == [1, 1, 1, 1]
+    assert test_spin.state == 15
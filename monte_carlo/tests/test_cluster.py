@@ -0,0 +1,39 @@
+"""
+Unit and regression test for the cluster updates.
+"""
+
+# Import package, test suite, and other packages as needed
+import pytest
+import monte_carlo
+
+import numpy as np
+
+
+@pytest.mark.parametrize("update", [monte_carlo.wolff_update, monte_carlo.swendsen_wang_update])
+@pytest.mark.parametrize("N_length", [1, 2, 7])
+def test_cluster_update_deltas(update, N_length):
+    test_spin = monte_carlo.SpinConfig(N_length, rng=0)
+    for J, u in [(-2, 1.1), (1.0, 0.3)]:
+        spins = np.array(test_spin.init_rand_spinlist(), dtype=np.int8)
+        for move in range(50):
+            energy_before = test_spin.hamiltonian(J, u)
+            magnet_before = test_spin.magnetization()
+
+            dE, dm = update(spins, 1.0, J, u)
+            test_spin.spinlist = spins.tolist()
+
+            assert test_spin.hamiltonian(J, u) - energy_before == pytest.approx(dE, abs=1e-12)
+            assert test_spin.magnetization() - magnet_before == dm
+
+
+@pytest.mark.parametrize("algorithm", ["wolff", "swendsen_wang"])
+def test_observable_cluster_sampling(algorithm):
+    test_spin = monte_carlo.SpinConfig(8, rng=0)
+    E, m, C, ms = test_spin.observable_cluster_sampling(T=1, sample_size_M=5000, u=0.3, J=1.0, algorithm=algorithm)
+    E_theory, m_theory, C_theory, ms_theory = test_spin.observable_theory(T=1, u=0.3, J=1.0)
+
+    assert E == pytest.approx(E_theory, rel=0.02)
+    assert m == pytest.approx(m_theory, rel=0.05)
+
+    with pytest.raises(ValueError):
+        test_spin.observable_cluster_sampling(algorithm="metropolis")
@@ -0,0 +1,53 @@
+"""
+Unit and regression test for the bulk decimal and spin matrix conversion.
+"""
+
+# Import package, test suite, and other packages as needed
+import pytest
+import monte_carlo
+
+import numpy as np
+
+
+@pytest.mark.parametrize("N_length", [1, 7, 8, 9, 63, 64, 65, 130])
+def test_decimals_to_spins_round_trip(N_length):
+    rng = monte_carlo.make_rng(N_length)
+    decimals = [0, 1, 2**N_length - 1] + [int(rng.integers(0, 2**62)) % 2**N_length for k in range(5)]
+    if N_length >= 64:
+        decimals = np.array(decimals, dtype=object)
+
+    spins = monte_carlo.decimals_to_spins(decimals, N_length)
+    assert spins.shape == (8, N_length)
+    assert spins.dtype == np.uint8
+
+    # every row is the spinlist of init_input_decimal
+    test_spin = monte_carlo.SpinConfig(N_length)
+    for decimal, row in zip(decimals, spins):
+        assert row.tolist() == test_spin.init_input_decimal(int(decimal))
+
+    assert [int(decimal) for decimal in monte_carlo.spins_to_decimals(spins)] == [int(d) for d in decimals]
+
+
+def test_decimals_to_spins_dtypes():
+    decimals = np.arange(2**10)
+    spins = monte_carlo.decimals_to_spins(decimals, 10, dtype=np.int8)
+    assert spins.dtype == np.int8
+    assert np.array_equal(monte_carlo.spins_to_decimals(spins), decimals)
+    assert monte_carlo.spins_to_decimals(spins).dtype == np.int64
+
+    assert monte_carlo.spins_to_decimals(monte_carlo.decimals_to_spins([2**64 - 1], 64)).dtype == np.uint64
+    assert monte_carlo.decimals_to_spins([], 5).shape == (0, 5)
+
+    # a SpinEnsemble can start from enumerated configurations
+    ensemble = monte_carlo.SpinEnsemble(4, 3)
+    ensemble.spins = monte_carlo.decimals_to_spins([0, 5, 15], 4, dtype=np.int8)
+    assert np.array_equal(ensemble.magnetization(), [-4, 0, 4])
+
+    with pytest.raises(ValueError):
+        monte_carlo.decimals_to_spins([16], 4)
+    with pytest.raises(ValueError):
+        monte_carlo.decimals_to_spins([-1], 4)
+    with pytest.raises(ValueError):
+        monte_carlo.decimals_to_spins([2**70], 70)
+    with pytest.raises(ValueError):
+        monte_carlo.spins_to_decimals([0, 1, 1])
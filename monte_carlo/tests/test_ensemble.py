@@ -0,0 +1,53 @@
+"""
+Unit and regression test for the batched multi-chain sampler.
+"""
+
+# Import package, test suite, and other packages as needed
+import pytest
+import monte_carlo
+
+import numpy as np
+
+
+def test_spinensemble_hamiltonian():
+    test_ensemble = monte_carlo.SpinEnsemble(8, 20, rng=0)
+    test_spin = monte_carlo.SpinConfig(8)
+
+    test_ensemble.init_rand_spins()
+    calculated_energy = test_ensemble.hamiltonian(J=1.5, u=-0.3)
+    calculated_magnet = test_ensemble.magnetization()
+
+    for k in range(test_ensemble.K_chains):
+        test_spin.spinlist = test_ensemble.spins[k].tolist()
+        assert test_spin.hamiltonian(J=1.5, u=-0.3) == pytest.approx(calculated_energy[k])
+        assert test_spin.magnetization() == calculated_magnet[k]
+
+
+def test_spinensemble_sampling():
+    test_ensemble = monte_carlo.SpinEnsemble(8, 500, rng=0)
+    E, m, C, ms = test_ensemble.observable_metropolis_sampling(T=3, sample_size_M=2000)
+    E_theory, m_theory, C_theory, ms_theory = monte_carlo.SpinConfig(8).observable_theory(T=3)
+
+    assert E.shape == (500,)
+    # the chains are independent, so their spread gives the error bar of the ensemble average
+    assert abs(E.mean() - E_theory) < 5 * E.std() / np.sqrt(len(E))
+    assert abs(m.mean() - m_theory) < 5 * m.std() / np.sqrt(len(m))
+
+    # running totals must agree with a full evaluation of the final states
+    assert test_ensemble.energy == pytest.approx(test_ensemble.hamiltonian(J=-2, u=1.1))
+    assert np.array_equal(test_ensemble.magnet, test_ensemble.magnetization())
+
+
+@pytest.mark.parametrize("N_length", [1, 2, 7, 8])
+@pytest.mark.parametrize("update", ["metropolis", "heat_bath"])
+def test_spinensemble_sweep_sampling(N_length, update):
+    test_ensemble = monte_carlo.SpinEnsemble(N_length, 200, rng=0)
+    E, m, C, ms = test_ensemble.observable_sweep_sampling(T=3, sweeps=300, update=update)
+    E_theory, m_theory, C_theory, ms_theory = monte_carlo.SpinConfig(N_length).observable_theory(T=3)
+
+    assert abs(E.mean() - E_theory) < 5 * E.std() / np.sqrt(len(E))
+    assert abs(m.mean() - m_theory) < 5 * m.std() / np.sqrt(len(m))
+    assert test_ensemble.energy == pytest.approx(test_ensemble.hamiltonian(J=-2, u=1.1))
+
+    with pytest.raises(ValueError):
+        test_ensemble.observable_sweep_sampling(update="glauber")
@@ -0,0 +1,120 @@
+"""
+Unit and regression test for the exact solutions: enumeration, transfer matrix and density of states.
+"""
+
+# Import package, test suite, and other packages as needed
+import pytest
+import monte_carlo
+
+import numpy as np
+
+
+@pytest.mark.parametrize("N_length", [1, 2, 3, 6, 9])
+@pytest.mark.parametrize(
+    "T, J, u", [(10, -2, 1.1), (0.3, -2, 1.1), (1.0, 1.5, -0.3), (2.0, 0, 0.7), (0.05, 1, 0), (0.05, -1, 0)]
+)
+def test_transfer_matrix_matches_enumeration(N_length, T, J, u):
+    test_spin = monte_carlo.SpinConfig(N_length)
+
+    expected_observables = monte_carlo.enumeration_observables(N_length, T, J, u)
+    calculated_observables = test_spin.observable_transfer_matrix(T, J, u)
+
+    assert expected_observables == pytest.approx(calculated_observables, rel=1e-8, abs=1e-8)
+
+
+@pytest.mark.parametrize("N_length, T, J, u", [(1, 3.0, -2, 1.1), (2, 1.0, 1.0, 0.5), (7, 0.05, -2, 1.1)])
+def test_enumeration_observables(N_length, T, J, u):
+    # reference of the reference: every state through hamiltonian() and magnetization()
+    test_spin = monte_carlo.SpinConfig(N_length)
+    energy = np.empty(test_spin.iMax)
+    magnet = np.empty(test_spin.iMax)
+    for i_list in range(test_spin.iMax):
+        test_spin.init_input_decimal(i_list)
+        energy[i_list] = test_spin.hamiltonian(J, u)
+        magnet[i_list] = test_spin.magnetization()
+    Zi = np.exp(-(energy - energy.min()) / T)
+    Zi /= Zi.sum()
+    E = Zi @ energy
+    m = Zi @ magnet
+    expected_observables = (E, m, Zi @ (energy - E) ** 2 / T**2, Zi @ (magnet - m) ** 2 / T)
+
+    assert monte_carlo.enumeration_observables(N_length, T, J, u) == pytest.approx(expected_observables, abs=1e-12)
+    # the chunks only change the order of the sums
+    assert monte_carlo.enumeration_observables(N_length, T, J, u, chunk_size=3) == pytest.approx(
+        expected_observables, abs=1e-12
+    )
+
+    with pytest.raises(ValueError):
+        monte_carlo.enumeration_observables(64)
+
+
+@pytest.mark.parametrize(
+    "N_length, T, J, u", [(1000, 0.02, 2, 0.3), (3, 0.02, -2, 1.1), (500, 0.1, 1, 0), (200, 0.03, -1, 2.5)]
+)
+def test_transfer_matrix_low_temperature_variances(N_length, T, J, u):
+    # the variances are tiny deviations from the ground state and must not cancel below zero
+    E, m, C, ms = monte_carlo.transfer_matrix_observables(N_length, T, J, u)
+    expected_E, expected_m, expected_C, expected_ms = monte_carlo.density_of_states_observables(
+        monte_carlo.density_of_states(N_length), T, J, u
+    )
+
+    assert C >= 0 and ms >= 0
+    assert (E, m) == pytest.approx((expected_E, expected_m), rel=1e-12, abs=1e-9)
+    assert (C, ms) == pytest.approx((expected_C, expected_ms), rel=1e-8, abs=1e-12)
+
+
+def test_transfer_matrix_large_chain():
+    N_length = 10**6
+    T = np.array([0.5, 1.0, 2.0])
+
+    E, m, C, ms = monte_carlo.transfer_matrix_observables(N_length, T)
+
+    # the observables are extensive, per site values converge to the thermodynamic limit
+    E_small, m_small, C_small, ms_small = monte_carlo.transfer_matrix_observables(N_length // 10, T)
+    assert E / N_length == pytest.approx(E_small / (N_length // 10))
+    assert m / N_length == pytest.approx(m_small / (N_length // 10))
+    assert np.all(np.isfinite(C)) and np.all(ms > 0)
+
+
+@pytest.mark.parametrize("N_length", [1, 2, 5, 8])
+def test_density_of_states(N_length):
+    test_spin = monte_carlo.BitSpinConfig(N_length)
+
+    expected_g = np.zeros((N_length + 1, N_length + 1))
+    for decimal_input in range(test_spin.iMax):
+        test_spin.init_input_decimal(decimal_input)
+        expected_g[test_spin.spinlist.count(1), test_spin.domain_walls()] += 1
+
+    calculated_g = test_spin.density_of_states()
+
+    assert np.array_equal(expected_g, calculated_g)
+    # the in-process cache hands out the same read-only array
+    assert monte_carlo.density_of_states(N_length) is calculated_g
+    assert not calculated_g.flags.writeable
+
+
+def test_density_of_states_disk_cache(tmp_path):
+    cache_dir = str(tmp_path / "dos")
+
+    expected_g = monte_carlo.density_of_states(12)
+    written_g = monte_carlo.density_of_states(12, cache_dir=cache_dir)
+    # repeated calls are served from memory
+    assert monte_carlo.density_of_states(12, cache_dir=cache_dir) is written_g
+
+    monte_carlo.exact._disk_density_of_states.cache_clear()
+    loaded_g = monte_carlo.density_of_states(12, cache_dir=cache_dir)
+
+    assert (tmp_path / "dos" / "dos_N12.npy").exists()
+    assert np.array_equal(expected_g, written_g)
+    assert np.array_equal(expected_g, loaded_g)
+    assert loaded_g.sum() == 2**12
+
+    # stale or truncated files are recomputed and replaced
+    for stale_content in [np.zeros((5, 5)), None]:
+        monte_carlo.exact._disk_density_of_states.cache_clear()
+        if stale_content is None:
+            (tmp_path / "dos" / "dos_N12.npy").write_bytes(b"\x93NUMPY")
+        else:
+            np.save(tmp_path / "dos" / "dos_N12.npy", stale_content)
+        assert np.array_equal(expected_g, monte_carlo.density_of_states(12, cache_dir=cache_dir))
+        assert np.load(tmp_path / "dos" / "dos_N12.npy").shape == (13, 13)
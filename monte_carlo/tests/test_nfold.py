@@ -0,0 +1,39 @@
+"""
+Unit and regression test for the rejection-free n-fold way sampler.
+"""
+
+# Import package, test suite, and other packages as needed
+import pytest
+import monte_carlo
+from monte_carlo.nfold import SiteClasses
+
+
+def test_site_classes():
+    spins = [0, 0, 0, 0, 1, 0, 1, 0]
+    test_classes = SiteClasses(spins)
+
+    assert test_classes.counts() == [3, 2, 1, 2, 0, 0]
+
+    rng = monte_carlo.make_rng(0)
+    for move in range(200):
+        test_classes.flip(rng.integers(0, len(spins)))
+
+        # the incremental bookkeeping matches a classification from scratch
+        expected_classes = SiteClasses(list(spins))
+        assert test_classes.counts() == expected_classes.counts()
+        for c, members in enumerate(test_classes.members):
+            assert sorted(members) == sorted(expected_classes.members[c])
+            for site in members:
+                assert test_classes.site_class[site] == c
+                assert members[test_classes.position[site]] == site
+
+
+def test_observable_nfold_sampling():
+    test_spin = monte_carlo.SpinConfig(8, rng=0)
+    E, m, C, ms = test_spin.observable_nfold_sampling(T=1, sample_size_M=5000, u=0.3, J=1.0)
+    E_theory, m_theory, C_theory, ms_theory = test_spin.observable_theory(T=1, u=0.3, J=1.0)
+
+    assert E == pytest.approx(E_theory, rel=0.02)
+    assert m == pytest.approx(m_theory, rel=0.05)
+    assert test_spin.energy == pytest.approx(test_spin.hamiltonian(J=1.0, u=0.3))
+    assert test_spin.magnet == test_spin.magnetization()
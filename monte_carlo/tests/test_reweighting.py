@@ -0,0 +1,64 @@
+"""
+Unit and regression test for the histogram reweighting.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+import monte_carlo
+
+
+def _exact_histogram(N_length, T, J, u, n_samples=10**6):
+    """Expected (E, m) histogram of n_samples independent samples at temperature T."""
+    g = monte_carlo.density_of_states(N_length)
+    n_up, n_walls = np.nonzero(g)
+    magnet = 2.0 * n_up - N_length
+    energy = u * magnet - J * (N_length - 2 * n_walls)
+    weights = g[n_up, n_walls] * np.exp(-(energy - energy.min()) / T)
+
+    return energy, magnet, n_samples * weights / weights.sum()
+
+
+def test_energy_histogram():
+    energy, magnet, counts = monte_carlo.energy_histogram([-4.0, -4.0, 2.0, -4.0 + 1e-13], [0, 0, 2, 0])
+    assert np.array_equal(energy, [-4.0, 2.0])
+    assert np.array_equal(magnet, [0.0, 2.0])
+    assert np.array_equal(counts, [3, 1])
+
+
+def test_single_histogram_exact():
+    T_list = np.array([0.5, 1.0, 2.0, 5.0])
+    histogram = _exact_histogram(8, 2.0, -2, 1.1)
+    expected = monte_carlo.SpinConfig(8).observable_theory_scan(T_list, -2, 1.1)
+    calculated = monte_carlo.single_histogram_reweighting(*histogram, 2.0, T_list)
+
+    for expected_observable, calculated_observable in zip(expected, calculated):
+        assert np.allclose(expected_observable, calculated_observable, rtol=1e-9)
+
+
+def test_multi_histogram_exact():
+    T_samples = [0.5, 2.0, 8.0]
+    T_list = np.linspace(0.5, 8.0, 16)
+    histograms = [
+        _exact_histogram(10, T, 1.0, 0.3, n_samples) for T, n_samples in zip(T_samples, [10**4, 10**5, 10**6])
+    ]
+    expected = monte_carlo.SpinConfig(10).observable_theory_scan(T_list, 1.0, 0.3)
+    calculated = monte_carlo.multi_histogram_reweighting(histograms, T_samples, T_list)
+
+    for expected_observable, calculated_observable in zip(expected, calculated):
+        assert np.allclose(expected_observable, calculated_observable, rtol=1e-8)
+
+    with pytest.raises(ValueError):
+        monte_carlo.multi_histogram_reweighting(histograms, T_samples[:2], T_list)
+
+
+def test_reweight_metropolis_run():
+    test_spin = monte_carlo.SpinConfig(8, rng=5)
+    T_list = [1.8, 2.0, 2.2]
+    E_series, m_series = np.array(list(itertools.islice(test_spin.metropolis_stream(T=2.0), 200000))).T
+    histogram = monte_carlo.energy_histogram(E_series, m_series)
+
+    E, m, C, ms = monte_carlo.single_histogram_reweighting(*histogram, 2.0, T_list)
+    assert np.allclose(E, test_spin.observable_theory_scan(T_list, -2, 1.1)[0], atol=0.2)
@@ -0,0 +1,106 @@
+"""
+Unit and regression test for the random number generator helpers.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+import monte_carlo
+
+
+def test_make_rng():
+    rng = np.random.default_rng(3)
+    assert monte_carlo.make_rng(rng) is rng
+    assert isinstance(monte_carlo.make_rng(np.random.Philox(3)).bit_generator, np.random.Philox)
+    assert monte_carlo.make_rng(3).random() == np.random.default_rng(3).random()
+
+
+def test_spawn_rngs():
+    rngs = monte_carlo.spawn_rngs(42, 4)
+    draws = [rng.random(8).tolist() for rng in rngs]
+    assert len({tuple(draw) for draw in draws}) == 4
+
+    # the streams only depend on the seed
+    assert draws == [rng.random(8).tolist() for rng in monte_carlo.spawn_rngs(42, 4)]
+    assert draws[0] == monte_carlo.spawn_rngs(np.random.SeedSequence(42), 1)[0].random(8).tolist()
+
+
+def test_samplers_use_their_generator():
+    # the global state does not influence a seeded sampler
+    np.random.seed(0)
+    observables = monte_carlo.SpinConfig(8, rng=5).observable_metropolis_sampling(T=2, sample_size_M=2000)
+    np.random.seed(1)
+    assert monte_carlo.SpinConfig(8, rng=5).observable_metropolis_sampling(T=2, sample_size_M=2000) == observables
+
+    philox_spin = monte_carlo.SpinConfig(8, rng=np.random.Philox(5))
+    philox_spin.observable_metropolis_sampling(T=2, sample_size_M=2000)
+    assert isinstance(philox_spin.rng.bit_generator, np.random.Philox)
+
+
+def test_random_buffer():
+    buffer = monte_carlo.RandomBuffer(monte_carlo.make_rng(4), 5, buffer_size=3)
+    pairs = [buffer.draw() for k in range(10)]
+    assert all(0 <= site < 5 and 0 <= uniform < 1 for site, uniform in pairs)
+
+    # the pairs only depend on the seed, not on the block size
+    large_buffer = monte_carlo.RandomBuffer(monte_carlo.make_rng(4), 5, buffer_size=1000)
+    assert [large_buffer.draw() for k in range(10)] == pairs
+
+    # a restored buffer continues the stream, also in the middle of a block
+    state = buffer.get_state()
+    expected = [buffer.draw() for k in range(5)]
+    restored = monte_carlo.RandomBuffer(monte_carlo.make_rng(99), 5, buffer_size=3)
+    restored.set_state(state)
+    assert [restored.draw() for k in range(5)] == expected
+    assert restored.rng.random() == buffer.rng.random()
+
+    # released pairs go back to the generator, which continues right after the last pair handed out
+    scalar_rng = monte_carlo.make_rng(4)
+    scalar_rng.random(20)
+    large_buffer.release()
+    assert large_buffer.rng.random() == scalar_rng.random()
+
+    with pytest.raises(ValueError):
+        monte_carlo.RandomBuffer(monte_carlo.make_rng(4), 5, buffer_size=0)
+
+
+def test_metropolis_buffer_size():
+    # the chain of a seed does not depend on the size of the proposal blocks
+    streams = []
+    for buffer_size in (1, 7, 65536):
+        test_spin = monte_carlo.SpinConfig(9, rng=13, buffer_size=buffer_size)
+        streams.append(list(itertools.islice(test_spin.metropolis_stream(T=1.5), 500)))
+    assert streams[0] == streams[1] == streams[2]
+
+
+def test_consecutive_runs_buffer_size():
+    # a second run on the same generator starts where the proposals of the first one ended
+    runs = []
+    for buffer_size in (7, 65536):
+        test_spin = monte_carlo.SpinConfig(8, rng=1, buffer_size=buffer_size)
+        runs.append([test_spin.observable_metropolis_sampling(2.0, 2000) for k in range(2)])
+    assert runs[0] == runs[1]
+
+
+def test_checkpoints_load_without_pickle(tmp_path):
+    test_spin = monte_carlo.SpinConfig(8, rng=np.random.Philox(3))
+    test_spin.observable_metropolis_sampling(
+        T=2, sample_size_M=3000, checkpoint_path=tmp_path / "run.npz", checkpoint_interval=0
+    )
+    walker = monte_carlo.WangLandau(4, rng=3)
+    walker.run(max_steps=100)
+    walker.save(tmp_path / "walker.npz")
+
+    bit_generators = []
+    for path in [tmp_path / "run.npz", tmp_path / "walker.npz"]:
+        with np.load(path, allow_pickle=False) as checkpoint:
+            rng = monte_carlo.rng._rng_from_state_text(checkpoint["rng_state"])
+            monte_carlo.RandomBuffer(rng).set_state(checkpoint["buffer_state"])
+            bit_generators.append(type(rng.bit_generator))
+    assert bit_generators == [np.random.Philox, np.random.PCG64]
+
+    # only numpy bit generators are rebuilt from a state
+    with pytest.raises(ValueError):
+        monte_carlo.rng._rng_from_state_text('{"bit_generator": "seed"}')
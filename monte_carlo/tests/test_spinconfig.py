@@ -3,6 +3,7 @@ Unit and regression test for the monte_carlo package.
 """
 
 # Import package, test suite, and other packages as needed
+import itertools
 import sys
 import pytest
 import monte_carlo
@@ -46,5 +47,225 @@ def test_spinconfig():
     assert expected_init_input_decimal == calculated_init_input_decimal
     assert expected_magnetization == calculated_magnetization
     assert expected_hamiltonian == calculated_hamiltonian
-    assert expected_observable_theory == test_spin_observable_theory
+    assert expected_observable_theory == pytest.approx(test_spin_observable_theory, rel=1e-12)
     assert expected_input_str == calculated_input_str
+
+
+def test_delta_energy():
+    test_spin = monte_carlo.SpinConfig(8)
+
+    for decimal_input in [0, 10, 77, 255]:
+        for site in range(test_spin.N_length):
+            test_spin.init_input_decimal(decimal_input)
+            energy_before = test_spin.hamiltonian(J=1.5, u=-0.3)
+            calculated_delta_energy = test_spin.delta_energy(site, J=1.5, u=-0.3)
+            test_spin.flip(site)
+            expected_delta_energy = test_spin.hamiltonian(J=1.5, u=-0.3) - energy_before
+
+            assert expected_delta_energy == pytest.approx(calculated_delta_energy)
+
+
+def test_metropolis_running_totals():
+    test_spin = monte_carlo.SpinConfig(8, rng=0)
+
+    test_spin.observable_metropolis_sampling(sample_size_M=1000, J=1.5, u=-0.3)
+
+    # running totals must agree with a full evaluation of the final state
+    assert test_spin.energy == pytest.approx(test_spin.hamiltonian(J=1.5, u=-0.3))
+    assert test_spin.magnet == test_spin.magnetization()
+
+
+def test_acceptance_table():
+    test_spin = monte_carlo.SpinConfig(8)
+
+    T, J, u = 2.5, -2, 1.1
+    calculated_acceptance = test_spin.acceptance_table(T, J, u)
+
+    for spin in range(2):
+        for up_neighbors in range(3):
+            # build a neighborhood with the given number of up neighbors around site 1
+            spinlist = [0] * test_spin.N_length
+            spinlist[1] = spin
+            spinlist[0] = 1 if up_neighbors >= 1 else 0
+            spinlist[2] = 1 if up_neighbors == 2 else 0
+            test_spin.spinlist = spinlist
+
+            dE = test_spin.delta_energy(1, J, u)
+            expected_acceptance = min(1.0, np.exp(-dE / T))
+
+            assert calculated_acceptance[spin, up_neighbors] == pytest.approx(expected_acceptance)
+    assert test_spin.acceptance is calculated_acceptance
+
+
+@pytest.mark.parametrize(
+    "N_length, T, J, u", [(1, 3.0, -2, 1.1), (2, 1.0, 1.0, 0.5), (9, 0.05, -2, 1.1), (10, 4.0, 0.7, -0.2)]
+)
+def test_observable_theory_enumeration(N_length, T, J, u):
+    test_spin = monte_carlo.SpinConfig(N_length)
+
+    expected_observable_theory = monte_carlo.enumeration_observables(N_length, T, J, u)
+    calculated_observable_theory = test_spin.observable_theory(T, J, u)
+
+    assert expected_observable_theory == pytest.approx(calculated_observable_theory, rel=1e-9, abs=1e-9)
+
+
+def test_observable_theory_scan():
+    test_spin = monte_carlo.SpinConfig(9)
+    T_list = np.array([0.1, 0.5, 1.0, 3.0, 10.0])
+
+    calculated_observables = np.array(test_spin.observable_theory_scan(T_list, J=1.5, u=-0.3))
+
+    expected_observables = np.array(monte_carlo.enumeration_observables(9, T_list, J=1.5, u=-0.3))
+    assert np.allclose(expected_observables, calculated_observables, rtol=1e-9, atol=1e-9)
+
+
+def test_metropolis_counts_every_step():
+    test_spin = monte_carlo.SpinConfig(8, rng=0)
+
+    E, m, C, ms = test_spin.observable_metropolis_sampling(T=3, sample_size_M=50000)
+    E_theory, m_theory, C_theory, ms_theory = test_spin.observable_theory(T=3)
+
+    # counting rejected proposals as steps makes the estimator unbiased
+    assert test_spin.steps == 50000
+    assert E == pytest.approx(E_theory, rel=0.03)
+    assert m == pytest.approx(m_theory, abs=0.1)
+
+    test_spin.observable_metropolis_sampling(T=3, sample_size_M=50000, max_steps=500)
+    assert test_spin.steps == 500
+
+    test_spin.observable_metropolis_sampling(T=3, sample_size_M=10**9, time_budget=0.0)
+    assert test_spin.steps == 1024
+
+
+def test_metropolis_stream():
+    test_spin = monte_carlo.SpinConfig(8, rng=0)
+
+    records = list(itertools.islice(test_spin.metropolis_stream(T=2, record="sweep", state=True), 50))
+
+    assert len(records) == 50
+    for E_sample, m_sample, spinlist in records:
+        test_spin.spinlist = spinlist
+        assert test_spin.hamiltonian() == pytest.approx(E_sample)
+        assert test_spin.magnetization() == m_sample
+
+    # the sampler is a reduction over the stream
+    test_spin.rng = monte_carlo.make_rng(0)
+    samples = np.array(list(itertools.islice(test_spin.metropolis_stream(T=2, J=1.5, u=-0.3), 3000)))
+    test_spin.rng = monte_carlo.make_rng(0)
+    E, m, C, ms = test_spin.observable_metropolis_sampling(T=2, sample_size_M=3000, J=1.5, u=-0.3)
+
+    assert E == pytest.approx(samples[:, 0].mean())
+    assert m == pytest.approx(samples[:, 1].mean())
+
+    with pytest.raises(ValueError):
+        next(test_spin.metropolis_stream(record="block"))
+
+
+def test_metropolis_burn_in():
+    test_spin = monte_carlo.SpinConfig(8, rng=0)
+
+    test_spin.observable_metropolis_sampling(T=2, sample_size_M=1000, burn_in=100)
+    assert (test_spin.burn_in, test_spin.steps) == (100, 900)
+    assert test_spin.E_stats.count == 900
+
+    with pytest.raises(ValueError):
+        test_spin.observable_metropolis_sampling(T=2, sample_size_M=1000, burn_in=1000)
+
+    # a run stopped within its burn-in has no samples to average
+    for target_error in [None, 0.01]:
+        observables = test_spin.observable_metropolis_sampling(
+            sample_size_M=10**6, burn_in=5000, time_budget=0.0, target_error=target_error
+        )
+        assert np.all(np.isnan(observables))
+        assert (test_spin.burn_in, test_spin.steps) == (1024, 0)
+
+    # a ferromagnet started from a random state relaxes into the ground state, all up in a negative field
+    E, m, C, ms = test_spin.observable_metropolis_sampling(T=0.5, sample_size_M=20000, u=-1.1, J=2, burn_in="mser")
+    assert 0 < test_spin.burn_in <= 10000
+    assert test_spin.burn_in + test_spin.steps == 20000
+    assert E == pytest.approx(test_spin.observable_theory(0.5, 2, -1.1)[0], abs=0.05)
+
+
+def test_metropolis_target_error():
+    test_spin = monte_carlo.SpinConfig(8, rng=4)
+    theory = test_spin.observable_theory(10, -2, 1.1)
+
+    observables = test_spin.observable_metropolis_sampling(sample_size_M=10**6, burn_in="mser", target_error=0.05)
+    assert test_spin.steps < 10**6
+    assert test_spin.E_error <= 0.05
+    assert test_spin.m_error <= 0.05
+    assert observables[0] == pytest.approx(theory[0], abs=5 * test_spin.E_error)
+    assert observables[1] == pytest.approx(theory[1], abs=5 * test_spin.m_error)
+
+
+@pytest.mark.parametrize("burn_in", [0, "mser"])
+def test_metropolis_checkpoint_resume(tmp_path, burn_in):
+    checkpoint_path = tmp_path / "run.npz"
+
+    uninterrupted = monte_carlo.SpinConfig(12, rng=8).observable_metropolis_sampling(2.0, 20000, burn_in=burn_in)
+
+    # a run preempted after 9000 steps leaves the checkpoint of step 8192, inside its 2nd block of proposals
+    preempted_spin = monte_carlo.SpinConfig(12, rng=8, buffer_size=5000)
+    preempted_spin.observable_metropolis_sampling(
+        2.0, 20000, max_steps=9000, burn_in=burn_in, checkpoint_path=checkpoint_path, checkpoint_interval=0
+    )
+    assert checkpoint_path.exists()
+
+    if burn_in == "mser":
+        # every checkpoint appended only its new samples to the series files
+        with np.load(checkpoint_path, allow_pickle=False) as checkpoint:
+            assert int(checkpoint["series_length"]) == 8192
+            assert "E_series" not in checkpoint
+        E_series_path = tmp_path / "run.npz.E_series.bin"
+        assert E_series_path.stat().st_size == 8192 * 8
+        # samples appended by a run killed before its next .npz was written are ignored
+        with open(E_series_path, "ab") as handle:
+            handle.write(np.ones(100).tobytes())
+
+    resumed_spin = monte_carlo.SpinConfig(12, rng=9, buffer_size=1000)
+    resumed = resumed_spin.observable_metropolis_sampling(
+        2.0, 20000, burn_in=burn_in, checkpoint_path=checkpoint_path, checkpoint_interval=0
+    )
+    assert resumed == uninterrupted
+    assert resumed_spin.burn_in + resumed_spin.steps == 20000
+
+    with pytest.raises(ValueError):
+        resumed_spin.observable_metropolis_sampling(3.0, 20000, burn_in=burn_in, checkpoint_path=checkpoint_path)
+
+
+@pytest.mark.parametrize(
+    "saved, resumed",
+    [
+        (dict(sample_size_M=5000), dict(sample_size_M=2000)),
+        (dict(burn_in=0), dict(burn_in=3000)),
+        (dict(), dict(burn_in="mser")),
+        (dict(), dict(target_error=0.05)),
+    ],
+)
+def test_metropolis_checkpoint_other_run(tmp_path, saved, resumed):
+    checkpoint_path = tmp_path / "run.npz"
+    run = dict(T=2.0, sample_size_M=5000, burn_in=0, checkpoint_path=checkpoint_path, checkpoint_interval=0)
+
+    monte_carlo.SpinConfig(12, rng=8).observable_metropolis_sampling(**dict(run, max_steps=4097, **saved))
+    assert checkpoint_path.exists()
+
+    # a checkpoint only resumes the run that wrote it
+    with pytest.raises(ValueError, match="cannot resume"):
+        monte_carlo.SpinConfig(12, rng=8).observable_metropolis_sampling(**dict(run, **resumed))
+
+
+def test_random_flip_reaches_every_site():
+    test_spin = monte_carlo.SpinConfig(4, rng=11)
+    test_spin.init_input_decimal(0)
+
+    flipped_sites = set()
+    for move in range(200):
+        before = list(test_spin.spinlist)
+        after = test_spin.random_flip()
+        flipped_sites.update(i for i in range(4) if before[i] != after[i])
+    assert flipped_sites == {0, 1, 2, 3}
+
+    # every configuration, including all up, is a possible initial state
+    test_spin = monte_carlo.SpinConfig(2, rng=12)
+    initial_states = {tuple(test_spin.init_rand_spinlist()) for draw in range(100)}
+    assert initial_states == {(0, 0), (0, 1), (1, 0), (1, 1)}
@@ -0,0 +1,67 @@
+"""
+Unit and regression test for the RunningStats accumulator.
+"""
+
+import numpy as np
+import pytest
+
+import monte_carlo
+
+
+def test_add_matches_numpy():
+    samples = np.random.default_rng(0).normal(1e6, 1.0, size=1000)
+    stats = monte_carlo.RunningStats()
+    for x in samples:
+        stats.add(x)
+
+    assert stats.count == 1000
+    assert stats.mean == pytest.approx(samples.mean(), rel=1e-14)
+    # the offset of 1e6 would cancel <x**2> - <x>**2 to a few digits
+    assert stats.variance == pytest.approx(samples.var(), rel=1e-8)
+
+
+def test_merge_equals_concatenation():
+    samples = np.random.default_rng(1).normal(size=(3, 500))
+    merged = monte_carlo.RunningStats()
+    for chain in samples:
+        chain_stats = monte_carlo.RunningStats()
+        chain_stats.add_batch(chain)
+        merged.merge(chain_stats)
+
+    assert merged.mean == pytest.approx(samples.mean())
+    assert merged.variance == pytest.approx(samples.var())
+
+    # merging an empty accumulator changes nothing
+    merged.merge(monte_carlo.RunningStats())
+    merged.add_batch(np.zeros(0))
+    assert merged.count == 1500
+
+    # an empty accumulator has no variance
+    assert np.isnan(monte_carlo.RunningStats().variance)
+
+
+def test_weighted_batch():
+    x = np.array([[1.0, 2.0, 4.0], [0.0, 1.0, 0.0]])
+    weights = np.array([1.0, 2.0, 1.0])
+    stats = monte_carlo.RunningStats()
+    stats.add_batch(x, weights, axis=-1)
+
+    mean = (x * weights).sum(axis=-1) / weights.sum()
+    variance = (weights * (x - mean[:, np.newaxis]) ** 2).sum(axis=-1) / weights.sum()
+    assert stats.mean == pytest.approx(mean)
+    assert stats.variance == pytest.approx(variance)
+
+    # the same samples one by one
+    online = monte_carlo.RunningStats()
+    for column, weight in zip(x.T, weights):
+        online.add(column, weight)
+    assert online.mean == pytest.approx(mean)
+    assert online.variance == pytest.approx(variance)
+
+
+def test_sampler_keeps_accumulators():
+    myspin = monte_carlo.SpinConfig(6)
+    E, m, C, ms = myspin.observable_metropolis_sampling(T=2, sample_size_M=500)
+    assert myspin.E_stats.count == myspin.steps
+    assert E == myspin.E_stats.mean
+    assert C == myspin.E_stats.variance / 4
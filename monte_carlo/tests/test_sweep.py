@@ -0,0 +1,28 @@
+"""
+Unit and regression test for the parallel parameter sweep.
+"""
+
+# Import package, test suite, and other packages as needed
+import monte_carlo
+
+import numpy as np
+
+
+def test_parameter_sweep():
+    T_list, u_list, J_list = [1.0, 3.0], [0.0, 1.1], [-2]
+
+    results = monte_carlo.parameter_sweep(T_list, u_list, J_list, N_length=6, sample_size_M=500, seed=7, max_workers=2)
+
+    assert results.dtype.names == ("T", "u", "J", "E", "m", "C", "ms")
+    assert results["T"].tolist() == [1.0, 1.0, 3.0, 3.0]
+    assert results["u"].tolist() == [0.0, 1.1, 0.0, 1.1]
+    assert np.all(results["J"] == -2)
+
+    # the same master seed reproduces the sweep with any number of workers
+    repeated_results = monte_carlo.parameter_sweep(
+        T_list, u_list, J_list, N_length=6, sample_size_M=500, seed=7, max_workers=1
+    )
+    assert np.array_equal(results, repeated_results)
+
+    # every grid point gets its own stream
+    assert len(set(results["E"].tolist())) > 1
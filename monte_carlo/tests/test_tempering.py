@@ -0,0 +1,41 @@
+"""
+Unit and regression test for replica exchange sampling.
+"""
+
+# Import package, test suite, and other packages as needed
+import pytest
+import monte_carlo
+
+import numpy as np
+
+
+def test_parallel_tempering():
+    T_list = [0.5, 1.0, 2.0, 4.0]
+    test_tempering = monte_carlo.ParallelTempering(8, T_list, rng=0)
+    E, m, C, ms = test_tempering.observable_tempering_sampling(sweeps=5000)
+    E_theory, m_theory, C_theory, ms_theory = monte_carlo.SpinConfig(8).observable_theory_scan(np.array(T_list))
+
+    assert E == pytest.approx(E_theory, rel=0.02)
+    assert m == pytest.approx(m_theory, abs=0.05)
+    assert test_tempering.swap_acceptance.shape == (3,)
+    assert np.all((test_tempering.swap_acceptance > 0) & (test_tempering.swap_acceptance <= 1))
+
+    # swaps move energies and magnetizations together with the configurations
+    assert test_tempering.energy == pytest.approx(test_tempering.replicas.hamiltonian())
+    assert np.array_equal(test_tempering.magnet, test_tempering.replicas.magnetization())
+
+
+def test_tune_ladder():
+    test_tempering = monte_carlo.ParallelTempering(16, np.linspace(0.3, 5.0, 6), rng=1)
+    tuned_T_list = test_tempering.tune_ladder(sweeps=300, rounds=10)
+
+    assert tuned_T_list[0] == pytest.approx(0.3)
+    assert tuned_T_list[-1] == pytest.approx(5.0)
+    assert np.all(np.diff(tuned_T_list) > 0)
+
+    # the tuned ladder swaps more evenly than the linear one
+    test_tempering.observable_tempering_sampling(sweeps=2000)
+    tuned_spread = np.ptp(test_tempering.swap_acceptance)
+    linear_tempering = monte_carlo.ParallelTempering(16, np.linspace(0.3, 5.0, 6), rng=1)
+    linear_tempering.observable_tempering_sampling(sweeps=2000)
+    assert tuned_spread < np.ptp(linear_tempering.swap_acceptance)
@@ -0,0 +1,64 @@
+"""
+Unit and regression test for the on-disk trajectory store.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+import monte_carlo
+
+
+def test_trajectory_roundtrip(tmp_path):
+    test_spin = monte_carlo.SpinConfig(13, rng=10)
+    records = list(itertools.islice(test_spin.metropolis_stream(T=2.0, state=True), 1000))
+
+    with monte_carlo.TrajectoryWriter(tmp_path / "run", 13, chunk_size=300) as writer:
+        for E, m, spinlist in records:
+            writer.append(spinlist, E, m)
+
+    trajectory = monte_carlo.TrajectoryReader(tmp_path / "run")
+    assert len(trajectory) == 1000
+    assert len(trajectory.index["chunks"]) == 4
+    assert np.array_equal(trajectory.energy, [E for E, m, spinlist in records])
+    assert np.array_equal(trajectory.magnet, [m for E, m, spinlist in records])
+    for k in (0, 299, 300, 999, -1):
+        assert trajectory[k].tolist() == records[k][2]
+
+    # rows are views of 2 bytes into the memmapped chunk
+    assert trajectory.packed(5).nbytes == 2
+    with pytest.raises(IndexError):
+        trajectory[1000]
+
+
+def test_trajectory_decimal_and_append(tmp_path):
+    test_spin = monte_carlo.BitSpinConfig(11)
+    test_spin.init_input_decimal(1234)
+
+    with monte_carlo.TrajectoryWriter(tmp_path / "run", 11) as writer:
+        writer.append(1234, -1.5, 1)
+
+    # reopening continues the trajectory with a new chunk
+    with monte_carlo.TrajectoryWriter(tmp_path / "run", 11) as writer:
+        writer.append(test_spin.spinlist, 2.5, -3)
+    with pytest.raises(ValueError):
+        monte_carlo.TrajectoryWriter(tmp_path / "run", 12)
+
+    trajectory = monte_carlo.TrajectoryReader(tmp_path / "run")
+    assert trajectory[0].tolist() == trajectory[1].tolist() == test_spin.spinlist
+    assert trajectory.energy.tolist() == [-1.5, 2.5]
+    assert trajectory.magnet.tolist() == [1, -3]
+
+
+def test_trajectory_ignores_unindexed_steps(tmp_path):
+    with monte_carlo.TrajectoryWriter(tmp_path / "run", 4) as writer:
+        writer.append([1, 0, 1, 0], 1.0, 0)
+
+    # a writer killed between writing the columns and the index
+    with open(tmp_path / "run" / "energy.bin", "ab") as handle:
+        handle.write(np.float64(7.0).tobytes())
+
+    assert len(monte_carlo.TrajectoryReader(tmp_path / "run").energy) == 1
+    monte_carlo.TrajectoryWriter(tmp_path / "run", 4).close()
+    assert (tmp_path / "run" / "energy.bin").stat().st_size == 8
@@ -0,0 +1,77 @@
+"""
+Unit and regression test for the Wang-Landau density of states estimator.
+"""
+
+import numpy as np
+import pytest
+
+import monte_carlo
+
+
+def test_wang_landau_density_of_states():
+    walker = monte_carlo.WangLandau(6, ln_f_final=1e-4, rng=6)
+    assert walker.run(check_interval=5000)
+
+    g = monte_carlo.density_of_states(6)
+    log_g = walker.log_density_of_states()
+    assert np.array_equal(np.isfinite(log_g), g > 0)
+    assert np.allclose(log_g[g > 0], np.log(g[g > 0]), atol=0.2)
+
+    T_list = np.array([1.0, 3.0, 10.0])
+    E, m = walker.observables(T_list, 1.0, 0.5)[:2]
+    expected_E, expected_m = monte_carlo.SpinConfig(6).observable_theory_scan(T_list, 1.0, 0.5)[:2]
+    assert np.allclose(E, expected_E, rtol=0.05, atol=0.05)
+    assert np.allclose(m, expected_m, rtol=0.05, atol=0.05)
+
+
+def test_wang_landau_single_site():
+    walker = monte_carlo.WangLandau(1, ln_f_final=1e-3)
+    assert walker.run(check_interval=100)
+    assert np.exp(walker.log_density_of_states()[[0, 1], 0]) == pytest.approx([1.0, 1.0], abs=0.05)
+
+
+def test_wang_landau_checkpoint(tmp_path):
+    walker = monte_carlo.WangLandau(6, ln_f_final=1e-3, rng=7)
+    assert not walker.run(max_steps=5000, check_interval=1000)
+    walker.save(tmp_path / "walker.npz")
+
+    restored = monte_carlo.WangLandau.load(tmp_path / "walker.npz")
+    assert restored.steps == walker.steps == 5000
+    assert restored.ln_f == walker.ln_f
+    assert restored.spin_config.spinlist == walker.spin_config.spinlist
+    assert np.array_equal(restored.log_g, walker.log_g)
+    assert np.array_equal(restored.histogram, walker.histogram)
+
+    # with the generator in the state it was saved in
+    assert restored.spin_config.rng.bit_generator.state == walker.spin_config.rng.bit_generator.state
+
+    # and continues the random walk of the saved one bit-for-bit
+    continued = monte_carlo.WangLandau.load(tmp_path / "walker.npz")
+    walker.run(max_steps=3000, check_interval=1000)
+    continued.run(max_steps=3000, check_interval=1000)
+    assert np.array_equal(continued.log_g, walker.log_g)
+    assert continued.spin_config.spinlist == walker.spin_config.spinlist
+
+    # the restored walker continues the schedule to convergence
+    assert restored.run(check_interval=1000)
+    assert restored.ln_f < 1e-3
+
+
+def test_wang_landau_split_run(tmp_path):
+    # a run interrupted by save and load checks flatness at the same steps as an uninterrupted one
+    uninterrupted = monte_carlo.WangLandau(6, ln_f_final=1e-3, rng=8)
+    uninterrupted.run(max_steps=8000, check_interval=1000)
+
+    walker = monte_carlo.WangLandau(6, ln_f_final=1e-3, rng=8)
+    walker.run(max_steps=2500, check_interval=1000)
+    # the checkpoint is written to the given name, without an added suffix
+    walker.save(tmp_path / "walker.ckpt")
+    assert [path.name for path in tmp_path.iterdir()] == ["walker.ckpt"]
+
+    resumed = monte_carlo.WangLandau.load(tmp_path / "walker.ckpt")
+    resumed.run(max_steps=5500, check_interval=1000)
+
+    assert resumed.steps == uninterrupted.steps == 8000
+    assert resumed.ln_f == uninterrupted.ln_f < 1.0
+    assert np.array_equal(resumed.log_g, uninterrupted.log_g)
+    assert resumed.spin_config.spinlist == uninterrupted.spin_config.spinlist
@@ -0,0 +1,209 @@
+"""
+Compact on-disk trajectories: bit-packed spin configurations with energy and magnetization columns
+
+A trajectory is a directory with
+    spins_00000.bin, ...  chunks of np.packbits rows, ceil(N_length / 8) bytes per configuration
+    energy.bin            float64 energy of every step, one contiguous column
+    magnet.bin            int64 magnetization of every step, one contiguous column
+    index.json            N_length and the number of steps in every chunk
+Files are only ever appended to, and index.json is replaced atomically after the data it describes is
+written, so steps beyond the index (e.g. of a killed writer) are ignored.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from ._atomic import _atomic_open
+
+
+def _write_index(path, index):
+    """Replace index.json of the trajectory directory path atomically."""
+    with _atomic_open(os.path.join(path, "index.json"), "w") as handle:
+        json.dump(index, handle)
+
+
+def _read_index(path):
+    """Read index.json of the trajectory directory path."""
+    with open(os.path.join(path, "index.json")) as handle:
+        return json.load(handle)
+
+
+class TrajectoryWriter:
+    def __init__(self, path, N_length=10, chunk_size=65536):
+        """Append spin configurations with their energy and magnetization to the trajectory directory path.
+
+        Configurations are buffered and written as one chunk file of chunk_size bit-packed rows, 1 bit per
+        spin instead of a python int per spin in a spinlist. An existing trajectory is continued with new
+        chunks.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the trajectory, created if missing.
+        N_length: integer , optional
+            Length of the spin chain.
+        chunk_size : int, optional
+            Number of configurations per chunk file, default chunk_size = 65536
+
+        Returns
+        -------
+        TrajectoryWriter : class
+            A writer, to be closed (or used as a context manager) to flush the last chunk.
+
+        Examples
+        --------
+        >>> import itertools
+        >>> myspin = SpinConfig(8)
+        >>> with TrajectoryWriter("run", 8) as writer:
+        ...     for E, m, spinlist in itertools.islice(myspin.metropolis_stream(state=True), 1000):
+        ...         writer.append(spinlist, E, m)
+        >>> len(TrajectoryReader("run"))
+        1000
+        """
+        self.path = path
+        self.N_length = N_length
+        self.chunk_size = chunk_size
+        self.row_bytes = (N_length + 7) // 8
+
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, "index.json")):
+            self.index = _read_index(path)
+            if self.index["N_length"] != N_length:
+                raise ValueError(f"trajectory {path} has N_length={self.index['N_length']}, not {N_length}. ")
+        else:
+            self.index = {"N_length": N_length, "chunks": []}
+            _write_index(path, self.index)
+
+        # drop column entries that a killed writer left beyond the index
+        steps = sum(count for file_name, count in self.index["chunks"])
+        for column, itemsize in (("energy.bin", 8), ("magnet.bin", 8)):
+            with open(os.path.join(path, column), "ab") as handle:
+                handle.truncate(steps * itemsize)
+
+        self._spins = np.empty((chunk_size, self.row_bytes), dtype=np.uint8)
+        self._energy = np.empty(chunk_size, dtype="<f8")
+        self._magnet = np.empty(chunk_size, dtype="<i8")
+        self._buffered = 0
+
+    def append(self, spins, E, m):
+        """Append one configuration.
+
+        Parameters
+        ----------
+        spins : list or int
+            A binary spinlist, or its decimal representation as in init_input_decimal.
+        E : float
+            Energy of the configuration.
+        m : int
+            Magnetization of the configuration.
+        """
+        if isinstance(spins, (int, np.integer)):
+            # site 0 is the highest bit; shifting out the padding gives the np.packbits layout
+            padding = 8 * self.row_bytes - self.N_length
+            row = np.frombuffer((int(spins) << padding).to_bytes(self.row_bytes, "big"), dtype=np.uint8)
+        else:
+            row = np.packbits(np.asarray(spins, dtype=np.uint8))
+
+        self._spins[self._buffered] = row
+        self._energy[self._buffered] = E
+        self._magnet[self._buffered] = m
+        self._buffered += 1
+
+        if self._buffered == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered configurations as a new chunk and extend the columns and the index."""
+        if self._buffered == 0:
+            return
+
+        file_name = f"spins_{len(self.index['chunks']):05d}.bin"
+        with open(os.path.join(self.path, file_name), "wb") as handle:
+            handle.write(self._spins[: self._buffered].tobytes())
+        with open(os.path.join(self.path, "energy.bin"), "ab") as handle:
+            handle.write(self._energy[: self._buffered].tobytes())
+        with open(os.path.join(self.path, "magnet.bin"), "ab") as handle:
+            handle.write(self._magnet[: self._buffered].tobytes())
+
+        self.index["chunks"].append([file_name, self._buffered])
+        _write_index(self.path, self.index)
+        self._buffered = 0
+
+    def close(self):
+        """Flush the last, possibly partial chunk."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TrajectoryReader:
+    def __init__(self, path):
+        """Memory-map a trajectory directory written by TrajectoryWriter.
+
+        Nothing is read up front: self.energy and self.magnet are numpy.memmap columns over every step, and
+        configuration k is unpacked from a memmap of its chunk on access.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the trajectory.
+
+        Returns
+        -------
+        TrajectoryReader : class
+            Random access to the steps of the trajectory.
+
+        Examples
+        --------
+        >>> trajectory = TrajectoryReader("run")
+        >>> trajectory[999]
+        array([0, 0, 1, 0, 0, 1, 0, 1], dtype=uint8)
+        >>> trajectory.energy[:3]
+        memmap([-8. , -5.8, -5.8])
+        """
+        self.path = path
+        self.index = _read_index(path)
+        self.N_length = self.index["N_length"]
+        self.row_bytes = (self.N_length + 7) // 8
+
+        counts = [count for file_name, count in self.index["chunks"]]
+        self.chunk_starts = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.steps = int(self.chunk_starts[-1])
+        self._chunks = [None] * len(counts)
+
+        self.energy = self._column("energy.bin", "<f8")
+        self.magnet = self._column("magnet.bin", "<i8")
+
+    def _column(self, file_name, dtype):
+        """Memmap of the first self.steps entries of a column file."""
+        if self.steps == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, file_name), dtype=dtype, mode="r", shape=(self.steps,))
+
+    def __len__(self):
+        return self.steps
+
+    def packed(self, k):
+        """Bit-packed row of configuration k, a zero-copy view into its chunk file."""
+        if not -self.steps <= k < self.steps:
+            raise IndexError(f"step {k} is out of range for a trajectory of {self.steps} steps. ")
+        k %= self.steps
+
+        chunk = int(np.searchsorted(self.chunk_starts, k, side="right")) - 1
+        if self._chunks[chunk] is None:
+            file_name, count = self.index["chunks"][chunk]
+            self._chunks[chunk] = np.memmap(
+                os.path.join(self.path, file_name), dtype=np.uint8, mode="r", shape=(count, self.row_bytes)
+            )
+
+        return self._chunks[chunk][k - self.chunk_starts[chunk]]
+
+    def __getitem__(self, k):
+        """Spins of configuration k as a uint8 array of 0 and 1."""
+        return np.unpackbits(self.packed(k), count=self.N_length)
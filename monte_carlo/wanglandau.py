@@ -0,0 +1,218 @@
+"""
+WangLandau class, flat-histogram estimate of the joint density of states of the periodic 1-d Ising chain
+"""
+
+import numpy as np
+
+from ._atomic import _atomic_open
+from .exact import _canonical_observables, _macrostate_energy
+from .rng import RandomBuffer, _rng_from_state_text, _rng_state_text
+from .spinconfig import SpinConfig
+
+
+class WangLandau:
+    def __init__(self, N_length=10, ln_f=1.0, ln_f_final=1e-8, flatness=0.8, rng=None, buffer_size=65536):
+        """Random walk of a SpinConfig in the (n_up, n_walls) macrostates with a flat-histogram acceptance.
+
+        A single flip from macrostate s to s' is accepted with min(1, g(s) / g(s')), and every visit
+        multiplies the running estimate g(s) by f. When the visit histogram is flat, f is replaced by
+        sqrt(f), until ln_f falls below ln_f_final. The macrostates do not depend on J and u, so one
+        estimate gives the observables of every temperature, coupling and field. The schedule (g, the
+        histogram, f and the walker) can be saved with save() and resumed with load().
+
+        Parameters
+        ----------
+        N_length: integer , optional
+            Length of the spin chain.
+        ln_f: float, optional
+            Initial log modification factor, default ln_f = 1.0
+        ln_f_final: float, optional
+            Log modification factor at which the estimate is converged, default ln_f_final = 1e-8
+        flatness: float, optional
+            A histogram is flat when its smallest visited entry reaches flatness times its mean,
+            default flatness = 0.8
+        rng: int, numpy.random.SeedSequence or numpy.random.Generator, optional
+            Seed or generator of the random numbers, see make_rng, default None draws fresh entropy.
+        buffer_size: int, optional
+            Number of pre-generated proposals per block, see RandomBuffer, default buffer_size = 65536
+
+        Returns
+        -------
+        WangLandau : class
+            A walker in a random configuration with log_g = 0 everywhere.
+
+        Examples
+        --------
+        >>> mywalker = WangLandau(8, ln_f_final=1e-4)
+        >>> mywalker.run()
+        True
+        >>> np.exp(mywalker.log_density_of_states()[4]).round()
+        array([ 0.,  0.,  8.,  0., 36.,  0., 24.,  0.,  2.])
+        """
+        self.N_length = N_length
+        self.ln_f = ln_f
+        self.ln_f_final = ln_f_final
+        self.flatness = flatness
+
+        self.log_g = np.zeros((N_length + 1, N_length + 1))
+        self.histogram = np.zeros((N_length + 1, N_length + 1), dtype=np.int64)
+        self.visited = np.zeros((N_length + 1, N_length + 1), dtype=bool)
+        self.steps = 0
+
+        self.spin_config = SpinConfig(N_length, rng)
+        self.spin_config.init_rand_spinlist()
+        self.random_buffer = RandomBuffer(self.spin_config.rng, N_length, buffer_size)
+
+    def _macrostate(self):
+        """Number of up spins and of domain walls of the current configuration."""
+        spinlist = self.spin_config.spinlist
+        n_walls = sum(spinlist[i] != spinlist[i - 1] for i in range(self.N_length))
+        return sum(spinlist), n_walls
+
+    def is_flat(self):
+        """Whether the visit histogram of the current stage is flat over every macrostate seen so far."""
+        counts = self.histogram[self.visited]
+        return counts.min() >= self.flatness * counts.mean()
+
+    def run(self, max_steps=None, check_interval=10000):
+        """Walk until ln_f falls below ln_f_final, or for at most max_steps further steps.
+
+        Parameters
+        ----------
+        max_steps: int, optional
+            Upper bound of flips proposed by this call, default None .
+        check_interval: int, optional
+            Number of steps between two flatness checks, default check_interval = 10000
+
+        Returns
+        -------
+        converged : bool
+            Whether ln_f reached ln_f_final; a False run can be continued by calling run() again.
+        """
+        n_up, n_walls = self._macrostate()
+        log_g = self.log_g
+        histogram = self.histogram
+        buffer = self.random_buffer
+
+        # flatness is checked on the schedule of all steps so far, so split runs match a single one
+        total_steps = self.steps
+        step = 0
+        while self.ln_f >= self.ln_f_final and (max_steps is None or step < max_steps):
+            step += 1
+            total_steps += 1
+            site, uniform = buffer.draw()
+            spin, up_neighbors = self.spin_config._local_state(site)
+
+            # a flip turns the anti-parallel neighbors of site into parallel ones and vice versa
+            new_n_up = n_up + 1 - 2 * spin
+            if self.N_length > 1:
+                anti_parallel = up_neighbors if spin == 0 else 2 - up_neighbors
+                new_n_walls = n_walls + 2 - 2 * anti_parallel
+            else:
+                new_n_walls = n_walls
+
+            log_ratio = log_g[n_up, n_walls] - log_g[new_n_up, new_n_walls]
+            if log_ratio >= 0 or uniform < np.exp(log_ratio):
+                self.spin_config._flip(site)
+                n_up, n_walls = new_n_up, new_n_walls
+
+            log_g[n_up, n_walls] += self.ln_f
+            histogram[n_up, n_walls] += 1
+            self.visited[n_up, n_walls] = True
+
+            if total_steps % check_interval == 0 and self.is_flat():
+                self.ln_f /= 2
+                histogram[:] = 0
+
+        self.steps = total_steps
+
+        return self.ln_f < self.ln_f_final
+
+    def log_density_of_states(self):
+        """Estimated log g[n_up, n_walls], normalized to 2**N_length states and -inf where never visited.
+
+        Returns
+        -------
+        log_g : numpy.ndarray
+            (N_length + 1) x (N_length + 1) table of log multiplicities.
+        """
+        log_g = np.where(self.visited, self.log_g, -np.inf)
+        log_g_max = log_g.max()
+        log_norm = log_g_max + np.log(np.exp(log_g - log_g_max).sum())
+
+        return log_g - log_norm + self.N_length * np.log(2.0)
+
+    def observables(self, T=10, J=-2, u=1.1):
+        """Observables of every temperature in T from the estimated density of states, in one vectorized pass.
+
+        Parameters
+        ----------
+        T : float or numpy.ndarray, optional
+            Temperature
+        J: float, optional
+            Coupling parameter, default J=-2 .
+        u: float, optional
+            External field strength, default u=1.1 .
+
+        Returns
+        -------
+        E, m, C, ms : set
+            Expectation of energy, average magnetism, heat capacibility, magnetic susceptbility, with the
+            shape of T.
+        """
+        log_g = self.log_density_of_states()
+        n_up, n_walls = np.nonzero(self.visited)
+        magnet = 2 * n_up - self.N_length
+        energy = _macrostate_energy(self.N_length, magnet, n_walls, J, u)
+
+        return _canonical_observables(log_g[n_up, n_walls], energy, magnet, T)
+
+    def save(self, path):
+        """Write the walker, its random generator and its modification-factor schedule to a .npz file.
+
+        Parameters
+        ----------
+        path : str
+            File name of the checkpoint, used as is.
+        """
+        with _atomic_open(path) as handle:
+            np.savez(
+                handle,
+                log_g=self.log_g,
+                histogram=self.histogram,
+                visited=self.visited,
+                schedule=np.array([self.ln_f, self.ln_f_final, self.flatness]),
+                steps=self.steps,
+                spinlist=np.array(self.spin_config.spinlist, dtype=np.int8),
+                rng_state=_rng_state_text(self.spin_config.rng),
+                buffer_state=self.random_buffer.get_state(),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Restore a walker written by save(), so that run() continues its schedule.
+
+        Parameters
+        ----------
+        path : str
+            File name of the checkpoint.
+
+        Returns
+        -------
+        WangLandau : class
+            The saved walker.
+        """
+        with np.load(path) as checkpoint:
+            ln_f, ln_f_final, flatness = checkpoint["schedule"]
+            walker = cls(len(checkpoint["spinlist"]), ln_f, ln_f_final, flatness)
+            # the constructor draws a random initial configuration, the saved generator is attached after it
+            walker.spin_config.rng = _rng_from_state_text(checkpoint["rng_state"])
+            walker.random_buffer = RandomBuffer(walker.spin_config.rng, walker.N_length)
+            walker.random_buffer.set_state(checkpoint["buffer_state"])
+            walker.log_g = checkpoint["log_g"]
+            walker.histogram = checkpoint["histogram"]
+            walker.visited = checkpoint["visited"]
+            walker.steps = int(checkpoint["steps"])
+            walker.spin_config.spinlist = checkpoint["spinlist"].tolist()
+
+        return walker